@@ -0,0 +1,68 @@
+"""
+Import-time benchmark for describer_ml.
+
+Imports each target in a fresh interpreter several times and reports
+the median wall time.  Exits non-zero if an import exceeds its budget
+or pulls in one of the heavy third-party dependencies which are meant
+to load lazily, so it can guard against regressions in CI:
+
+    python benchmarks/import_time.py
+"""
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = [
+    "scipy.stats", "scipy.spatial", "sklearn", "statsmodels",
+    "matplotlib", "thinkbayes2", "pandas"
+]
+
+# (import statement, budget in seconds)
+TARGETS = [
+    ("import describer_ml", 0.5),
+    ("import describer_ml.numeric.num_stats", 1.0),
+    ("from describer_ml.numeric.num_stats import trimean", 1.0),
+    ("import describer_ml.matching.match", 1.0),
+    ("import describer_ml.timeseries.timeseries", 1.0),
+]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy}}))
+"""
+
+def measure(statement, repeat=5):
+    timings = []
+    heavy = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+            check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["elapsed"])
+        heavy = result["heavy"]
+    return statistics.median(timings), heavy
+
+def main():
+    failed = False
+    for statement, budget in TARGETS:
+        elapsed, heavy = measure(statement)
+        status = "ok"
+        if heavy:
+            status = "FAIL (loaded {})".format(", ".join(heavy))
+            failed = True
+        elif elapsed > budget:
+            status = "FAIL (budget {:.2f}s)".format(budget)
+            failed = True
+        print("{:<55} {:.3f}s  {}".format(statement, elapsed, status))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
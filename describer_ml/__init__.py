@@ -1,7 +1,34 @@
+import importlib
+import sys
+import types
+
 __version__ = '0.28.1'
 
-from .timeseries import timeseries
-from .numeric import num_stats
-from .matching import match
+# submodules are imported on first attribute access, so
+# `import describer_ml` does not pay for statsmodels, sklearn, etc
+_SUBMODULES = {
+    "timeseries": "describer_ml.timeseries.timeseries",
+    "num_stats": "describer_ml.numeric.num_stats",
+    "match": "describer_ml.matching.match",
+}
 
 __all__ = ["timeseries", "num_stats", "match"]
+
+class _LazyPackage(types.ModuleType):
+    """
+    The type of this package, for its lazy attributes.  A module level
+    __getattr__ (PEP 562) would do, but needs Python 3.7.
+    """
+    def __getattr__(self, name):
+        if name in _SUBMODULES:
+            module = importlib.import_module(_SUBMODULES[name])
+            setattr(self, name, module)
+            return module
+        raise AttributeError(
+            "module 'describer_ml' has no attribute '{}'".format(name)
+        )
+
+    def __dir__(self):
+        return sorted(set(vars(self)) | set(__all__))
+
+sys.modules[__name__].__class__ = _LazyPackage
@@ -0,0 +1,38 @@
+import importlib
+
+class LazyModule:
+    """
+    Stands in for a module until one of its attributes is used,
+    then imports it.  Keeps heavy dependencies (scipy.stats, sklearn,
+    statsmodels) off the import path of describer_ml until needed.
+    """
+    def __init__(self, name, extra=None):
+        self._name = name
+        self._extra = extra
+        self._module = None
+
+    def __getattr__(self, attribute):
+        if self._module is None:
+            try:
+                self._module = importlib.import_module(self._name)
+            except ImportError as error:
+                if self._extra is None:
+                    raise
+                raise ImportError(
+                    "{} is an optional dependency, install it with "
+                    "pip install describer_ml[{}]".format(
+                        self._name.split(".")[0], self._extra
+                    )
+                ) from error
+        return getattr(self._module, attribute)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return "<lazy module '{}' ({})>".format(self._name, state)
+
+def lazy_import(name, extra=None):
+    """
+    @extra - for an optional dependency, the setup.py extra which
+    installs it, named in the ImportError if it is missing
+    """
+    return LazyModule(name, extra=extra)
@@ -0,0 +1,94 @@
+import numpy as np
+from describer_ml._lazy import lazy_import
+from describer_ml.numeric import num_stats
+
+pd = lazy_import("pandas")
+
+# statistics pandas computes per group in compiled code,
+# as (method name, keyword arguments) matching the num_stats definition
+PANDAS_REDUCTIONS = {
+    "mean": ("mean", {}),
+    "median": ("median", {}),
+    "variance": ("var", {"ddof": 0}),
+    "standard_deviation": ("std", {"ddof": 0})
+}
+
+# everything else runs the num_stats function over each group,
+# all columns at once along axis=0
+NUM_STATS_REDUCTIONS = {
+    "trimean": num_stats.trimean,
+    "mode": num_stats.mode,
+    "skew": num_stats.skew,
+    "kurtosis": num_stats.kurtosis,
+    "variation": num_stats.variation,
+    "interquartile_range": num_stats.interquartile_range,
+    "midhinge": num_stats.midhinge,
+    "entropy": num_stats.entropy,
+    "mean_absolute_deviation": num_stats.mean_absolute_deviation,
+    "median_absolute_deviation": num_stats.median_absolute_deviation,
+    "trimean_absolute_deviation": num_stats.trimean_absolute_deviation
+}
+
+class AggregationPlan:
+    """
+    Groups df by match_column once and computes any number of
+    per class statistics from that one grouping.
+
+    The group row indices are computed once and cached, so each
+    statistic is one sweep over the groups rather than another groupby.
+
+    @df - the data, every column other than match_column is aggregated
+    @match_column - the column holding the class labels
+    """
+    def __init__(self, df, match_column):
+        self.match_column = match_column
+        self.columns = [column for column in df.columns if column != match_column]
+        self.grouped = df.groupby(match_column, sort=True)[self.columns]
+        self.indices = self.grouped.indices
+        self.classes = list(self.indices.keys())
+        self._values = None
+        self._df = df
+
+    def group_values(self):
+        """
+        A 2-D (rows, columns) float array per class, in class order.
+        """
+        if self._values is None:
+            values = self._df[self.columns].to_numpy(dtype=float)
+            self._values = [values[self.indices[label]] for label in self.classes]
+        return self._values
+
+    def _aggregate_stat(self, stat):
+        if stat in PANDAS_REDUCTIONS:
+            method, kwargs = PANDAS_REDUCTIONS[stat]
+            result = getattr(self.grouped, method)(**kwargs)
+            return result.reindex(self.classes).to_numpy(dtype=float)
+        if stat not in NUM_STATS_REDUCTIONS:
+            raise ValueError("Unknown statistic: {}".format(stat))
+        function = NUM_STATS_REDUCTIONS[stat]
+        return np.array([
+            np.reshape(function(values, axis=0), len(self.columns))
+            for values in self.group_values()
+        ], dtype=float)
+
+    def aggregate(self, stats):
+        """
+        A DataFrame with one row per class and (stat, column) columns,
+        so table[stat] is the class by column table for one statistic.
+
+        @stats - names from PANDAS_REDUCTIONS or NUM_STATS_REDUCTIONS
+        """
+        stats = list(stats)
+        table = np.hstack([self._aggregate_stat(stat) for stat in stats])
+        return pd.DataFrame(
+            table.reshape(len(self.classes), len(stats) * len(self.columns)),
+            index=pd.Index(self.classes, name=self.match_column),
+            columns=pd.MultiIndex.from_product([stats, self.columns])
+        )
+
+def aggregate(df, match_column, stats):
+    """
+    Per class statistics for every column of df, from one groupby,
+    see AggregationPlan.aggregate.
+    """
+    return AggregationPlan(df, match_column).aggregate(stats)
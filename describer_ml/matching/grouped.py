@@ -0,0 +1,71 @@
+import numpy as np
+from describer_ml._lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+class GroupView:
+    """
+    One class of a GroupedFrame; group[column] is a read-only view
+    of that class's slice of the column, not a copy.
+    """
+    def __init__(self, grouped, index):
+        self.grouped = grouped
+        self.index = index
+
+    @property
+    def label(self):
+        return self.grouped.classes[self.index]
+
+    @property
+    def columns(self):
+        return self.grouped.columns
+
+    def __getitem__(self, column):
+        return self.grouped.group(self.index, column)
+
+    def __len__(self):
+        return int(self.grouped.offsets[self.index + 1] - self.grouped.offsets[self.index])
+
+class GroupedFrame:
+    """
+    The numeric columns of df sorted by class once, for the
+    distribution matchers.
+
+    Each column is one contiguous float buffer, a row of values, so
+    class i of a column is values[column, offsets[i]:offsets[i + 1]],
+    and groups are handed out as slice views rather than per group
+    DataFrame copies.  classes[i] is always the label of group i, in
+    sorted order like df.groupby(match_column); rows with a missing
+    label are dropped, as groupby does.
+
+    @df - the data
+    @match_column - the column holding the class labels
+    """
+    def __init__(self, df, match_column):
+        self.match_column = match_column
+        numeric = df.drop(columns=[match_column]).select_dtypes(include=["number", "bool"])
+        self.columns = list(numeric.columns)
+        codes, classes = pd.factorize(df[match_column], sort=True)
+        self.classes = list(classes)
+        order = np.argsort(codes, kind="stable")
+        order = order[codes[order] >= 0]
+        self.offsets = np.zeros(len(self.classes) + 1, dtype=int)
+        self.offsets[1:] = np.cumsum(np.bincount(codes[codes >= 0], minlength=len(self.classes)))
+        # filled a column at a time, so only one buffer is ever allocated
+        self.values = np.empty((len(self.columns), len(order)))
+        for position, column in enumerate(self.columns):
+            np.take(numeric[column].to_numpy(dtype=float), order, out=self.values[position])
+        self.values.flags.writeable = False
+        self._positions = {column: position for position, column in enumerate(self.columns)}
+
+    def __len__(self):
+        return len(self.classes)
+
+    def column(self, column):
+        return self.values[self._positions[column]]
+
+    def group(self, index, column):
+        return self.column(column)[self.offsets[index]:self.offsets[index + 1]]
+
+    def groups(self):
+        return [GroupView(self, index) for index in range(len(self.classes))]
@@ -0,0 +1,172 @@
+import pickle
+from itertools import combinations
+import numpy as np
+from describer_ml._lazy import lazy_import
+from describer_ml.matching.aggregate import PANDAS_REDUCTIONS, NUM_STATS_REDUCTIONS
+from describer_ml.matching.grouped import GroupedFrame
+from describer_ml.matching.match import get_matches, get_percent_matches
+from describer_ml.numeric.frequency import FrequencyTable
+from describer_ml.numeric.num_stats import ReferenceDistribution
+
+pd = lazy_import("pandas")
+
+def table_statistic(table, stat):
+    """
+    A per class statistic, as matching.aggregate computes it from the
+    rows, computed from the FrequencyTable of the rows instead.
+    """
+    if stat in PANDAS_REDUCTIONS:
+        # pandas skips NaN
+        return getattr(table.dropna(), stat)()
+    if stat not in NUM_STATS_REDUCTIONS:
+        raise ValueError("Unknown statistic: {}".format(stat))
+    return NUM_STATS_REDUCTIONS[stat](table)
+
+class IncrementalMatcher:
+    """
+    Keeps what get_multi_matches and distribution_match_cdf_* need
+    per class and column, so appending rows only recomputes the
+    classes and class pairs those rows touch.
+
+    Each class and column is held as a FrequencyTable, which merges
+    new rows exactly, with the per class statistics and pairwise CDF
+    scores cached alongside it.  The state can be saved and loaded
+    between runs.
+
+    @match_column - the column holding the class labels
+    @max_diffs - {statistic name: max_diff}, see get_multi_matches
+    @max_deviances - {column: max_deviance} for the CDF comparison,
+    None skips it
+    @spread, @boundary, @distance_function, @remove_outliers,
+    @outlier_method - see num_stats.ReferenceDistribution
+    @min_percent_match - see distribution_match_cdf_*
+    """
+    def __init__(self, match_column, max_diffs=None, max_deviances=None,
+                 spread="mean_absolute_deviation",
+                 min_percent_match=0.9,
+                 boundary=0.01,
+                 distance_function=None,
+                 remove_outliers=False,
+                 outlier_method="isolation_forest"):
+        self.match_column = match_column
+        self.max_diffs = dict(max_diffs or {})
+        self.max_deviances = max_deviances
+        self.spread = spread
+        self.min_percent_match = min_percent_match
+        self.boundary = boundary
+        self.distance_function = distance_function
+        self.remove_outliers = remove_outliers
+        self.outlier_method = outlier_method
+        self.columns = []
+        self.classes = []
+        self.tables = {}
+        self.statistics = {}
+        self.scores = {}
+        self._references = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # rebuilt on demand, and may hold a fitted outlier model
+        state["_references"] = {}
+        return state
+
+    def update(self, df):
+        """
+        Adds the rows of df and recomputes what they affect.
+        Returns the set of (class, column) which changed.
+        """
+        grouped = GroupedFrame(df, self.match_column)
+        for column in grouped.columns:
+            if column not in self.columns:
+                self.columns.append(column)
+        changed = set()
+        for group in grouped.groups():
+            for column in grouped.columns:
+                key = (group.label, column)
+                table = FrequencyTable.from_array(group[column])
+                if key in self.tables:
+                    table = self.tables[key].merge(table)
+                self.tables[key] = table
+                changed.add(key)
+        self.classes = sorted({label for label, _ in self.tables})
+        for key in changed:
+            self.statistics[key] = {
+                stat: table_statistic(self.tables[key], stat)
+                for stat in self.max_diffs
+            }
+            self._references.pop(key, None)
+        if self.max_deviances is not None:
+            self._update_scores(changed)
+        return changed
+
+    def _reference(self, label, column):
+        key = (label, column)
+        if key not in self._references:
+            self._references[key] = ReferenceDistribution(
+                self.tables[key], self.max_deviances[column],
+                spread=self.spread,
+                boundary=self.boundary,
+                distance_function=self.distance_function,
+                remove_outliers=self.remove_outliers,
+                outlier_method=self.outlier_method
+            )
+        return self._references[key]
+
+    def _update_scores(self, changed):
+        for label, column in changed:
+            for other in self.classes:
+                if other == label or (other, column) not in self.tables:
+                    continue
+                # the earlier class is the reference,
+                # as in distribution_match_cdf_*
+                first, second = sorted([label, other])
+                self.scores[(first, second, column)] = self._reference(
+                    first, column
+                ).score(self.tables[(second, column)])
+
+    def per_class(self, stat):
+        """
+        The class by column table of one statistic.
+        """
+        return pd.DataFrame(
+            [[self.statistics.get((label, column), {}).get(stat, np.nan)
+              for column in self.columns]
+             for label in self.classes],
+            index=self.classes, columns=self.columns
+        )
+
+    def multi_matches(self):
+        """
+        Same as get_multi_matches on all the rows added so far.
+        """
+        return {
+            stat: get_matches(self.per_class(stat), max_diff)
+            for stat, max_diff in self.max_diffs.items()
+        }
+
+    def multi_matching_columns(self):
+        matches = [set(columns) for columns in self.multi_matches().values()]
+        return list(matches[0].intersection(*matches[1:]))
+
+    def distribution_matches(self):
+        """
+        Same as distribution_match_cdf_* on all the rows added so far.
+        """
+        percent_matches = []
+        for class_combination in combinations(self.classes, 2):
+            for column in self.columns:
+                key = class_combination + (column,)
+                if key in self.scores:
+                    percent_matches.append((
+                        self.scores[key], class_combination, column
+                    ))
+        return get_percent_matches(percent_matches, self.min_percent_match)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            pickle.dump(self, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
@@ -1,62 +1,80 @@
+import warnings
 from itertools import combinations
+import numpy as np
+from describer_ml.matching.aggregate import aggregate
+from describer_ml.matching.grouped import GroupedFrame
+from describer_ml.matching.parallel import score_pairs
+from describer_ml.matching.pruning import candidate_pairs
+from describer_ml.matching.two_sample import pairwise_two_sample
 from describer_ml.numeric.num_stats import (
     trimean, mode, variance, standard_deviation,
     skew, kurtosis, variation, interquartile_range,
     midhinge, entropy, mean_absolute_deviation,
-    median_absolute_deviation, trimean_absolute_deviation,
-    compare_cdf_hard_coded_boundary,
-    compare_cdf_trimean_absolute_deviation,
-    compare_cdf_median_absolute_deviation,
-    compare_cdf_mean_absolute_deviation
+    median_absolute_deviation, trimean_absolute_deviation
 )
 
 def get_diffs(listing):
-    diffs = []
-    for elem in listing:
-        for other in listing:
-            diffs.append(
-                abs(elem - other)
-            )
-    return diffs
+    """
+    The absolute differences between every pair of values in listing.
+    For a 1-D listing that is a (k, k) matrix, for a (k, columns)
+    table of per class values a (columns, k, k) stack of them.
+    """
+    values = np.asarray(listing, dtype=float)
+    diffs = np.abs(values[:, np.newaxis] - values[np.newaxis, :])
+    return np.moveaxis(diffs, -1, 0) if values.ndim == 2 else diffs
 
 def within_tolerance(diffs, max_diff):
-    for diff in diffs:
-        if diff > max_diff:
-            return False
-    return True
-
-def get_matches(grouped_df, max_diff):
-    matching_columns = []
-    for column in grouped_df.columns:
-        diffs = get_diffs(grouped_df[column])
-        if within_tolerance(diffs, max_diff):
-            matching_columns.append(True)
+    return not np.any(np.asarray(diffs) > max_diff)
+
+def columns_within_tolerance(per_class, max_diff):
+    """
+    Whether every pair of classes is within max_diff, for each column
+    of a (classes, columns) table at once.
+
+    The largest pairwise difference is max - min, so this is O(k) per
+    column rather than the O(k^2) of comparing every pair.  NaN values
+    never break tolerance, as with get_diffs and within_tolerance.
+
+    @max_diff - a number, or one per column
+    """
+    values = np.asarray(per_class, dtype=float)
+    with warnings.catch_warnings():
+        # all-NaN columns
+        warnings.simplefilter("ignore", RuntimeWarning)
+        spread = np.nanmax(values, axis=0) - np.nanmin(values, axis=0)
+    return ~(spread > max_diff)
+
+def get_matches(grouped_df, max_diff, return_diffs=False):
+    """
+    The columns of grouped_df, a class by column table of one
+    statistic, whose values agree across classes to within max_diff.
+
+    @return_diffs - also return the (columns, classes, classes)
+    array of pairwise differences, to see which pairs of classes
+    break tolerance.
+    """
+    within = columns_within_tolerance(grouped_df, max_diff)
+    matching_columns = list(grouped_df.columns[within])
+    if return_diffs:
+        return matching_columns, get_diffs(grouped_df)
     return matching_columns
 
 def get_multi_matches(df, match_column, max_diffs):
-    match_map = {
-        "mean": mean_match,
-        "median": median_match,
-        "trimean": trimean_match,
-        "mode": mode_match,
-        "standard_deviation": standard_deviation_match,
-        "variance": variance_match,
-        "skew": skew_match,
-        "kurtosis": kurtosis_match,
-        "variation": variation_match,
-        "interquartile_range": interquartile_range_match,
-        "midhinge": midhinge_match,
-        "entropy": entropy_match,
-        "mean_absolute_deviation": mean_absolute_deviation_match,
-        "median_absolute_deviation": median_absolute_deviation_match,
-        "trimean_absolute_deviation": trimean_absolute_deviation_match
-    }
+    """
+    The columns whose per class statistic is within tolerance,
+    for each statistic in max_diffs.
+
+    df is grouped once and every statistic is computed from that
+    grouping, see describer_ml.matching.aggregate.
+
+    @max_diffs - {statistic name: max_diff}
+    """
+    per_class = aggregate(df, match_column, max_diffs.keys())
     matches = {}
     for match_algo in max_diffs:
         condition = max_diffs[match_algo]
-        matcher = match_map[match_algo]
-        matches[match_algo] = matcher(
-            df, match_column, condition
+        matches[match_algo] = get_matches(
+            per_class[match_algo], condition
         )
     return matches
 
@@ -128,11 +146,13 @@ def trimean_absolute_deviation_match(df, match_column, max_diff):
     return get_matches(trimean_absolute_deviation_per_class, max_diff)
 
 def get_groups_classes(df, match_column):
-    columns = df.columns.tolist()
-    columns.remove(match_column)
-    groups = [tmp_df for _, tmp_df in df.groupby(match_column)]
-    classes = list(df[match_column].unique())
-    return groups, classes
+    """
+    The groups of df by match_column, as GroupViews whose columns are
+    slices of one sorted buffer rather than DataFrame copies, and the
+    class label of each group.
+    """
+    grouped = GroupedFrame(df, match_column)
+    return grouped.groups(), grouped.classes
 
 def get_percent_matches(percent_matches, min_percent_match):
     matches = []
@@ -144,69 +164,106 @@ def get_percent_matches(percent_matches, min_percent_match):
             ))
     return matches
 
-def distribution_match_cdf_hard_coded(df, match_column, max_deviances,
-                                      min_percent_match=0.9,
-                                      distance_function=None,
-                                      boundary=0.01, remove_outliers=False):
-    groups, classes = get_groups_classes(
-        df, match_column
+def _distribution_match(df, match_column, max_deviances, spread,
+                        min_percent_match=0.9,
+                        distance_function=None,
+                        boundary=0.01,
+                        remove_outliers=False,
+                        outlier_method="isolation_forest",
+                        executor="serial",
+                        n_jobs=None,
+                        chunk_size=None,
+                        cancel_event=None,
+                        prune=True,
+                        return_pruning_stats=False,
+                        cache=True):
+    """
+    Compares the CDF of every column for every pair of classes,
+    see describer_ml.matching.parallel.score_pairs for
+    executor, n_jobs, chunk_size and cancel_event.
+
+    @prune - first skip the pairs which can't reach min_percent_match,
+    see describer_ml.matching.pruning.candidate_pairs.  Doesn't change
+    the result, and is only done for the default distance_function
+    without remove_outliers.
+    @return_pruning_stats - also return the PruningStats, None when
+    nothing was pruned
+    @cache - see num_stats.ReferenceDistribution.  By default the ECDFs,
+    inliers and spreads go in the shared cache.SUMMARY_CACHE, so
+    running the other distribution_match_cdf_* variants on the same
+    data reuses them.  Process workers each have their own.
+    """
+    grouped = GroupedFrame(df, match_column)
+    column_max_deviances = [max_deviances[column] for column in grouped.columns]
+    candidates, pruning_stats = None, None
+    if (prune and distance_function is None and not remove_outliers
+            and min_percent_match >= 0):
+        candidates, pruning_stats = candidate_pairs(
+            grouped.values, grouped.offsets,
+            column_max_deviances, min_percent_match
+        )
+    scores = score_pairs(
+        grouped.values, grouped.offsets,
+        column_max_deviances,
+        {
+            "spread": spread,
+            "boundary": boundary,
+            "distance_function": distance_function,
+            "remove_outliers": remove_outliers,
+            "outlier_method": outlier_method,
+            "cache": cache
+        },
+        executor=executor,
+        n_jobs=n_jobs,
+        chunk_size=chunk_size,
+        candidates=candidates,
+        cancel_event=cancel_event
     )
-    class_combinations = list(combinations(classes, 2))
     percent_matches_per_class_per_column = []
-    for index, combination in enumerate(combinations(groups, 2)):
-        first = combination[0]
-        second = combination[1]
-        for column in columns:
-            max_deviance = max_deviances[column]
-            percent_match = compare_cdf_hard_coded_boundary(
-                first[column],
-                second[column],
-                max_deviance,
-                distance_function=distance_function,
-                boundary=boundary,
-                remove_outliers=remove_outliers
-            )
-            percent_matches_per_class_per_column.append(
-                percent_match,
-                class_combinations[index],
+    for index, class_combination in enumerate(combinations(grouped.classes, 2)):
+        for column_index, column in enumerate(grouped.columns):
+            percent_matches_per_class_per_column.append((
+                scores[index, column_index],
+                class_combination,
                 column
-            )    
-    return get_percent_matches(
+            ))
+    percent_matches = get_percent_matches(
         percent_matches_per_class_per_column,
         min_percent_match
     )
+    if return_pruning_stats:
+        return percent_matches, pruning_stats
+    return percent_matches
+
+def distribution_match_cdf_hard_coded(df, match_column, max_deviances,
+                                      min_percent_match=0.9,
+                                      distance_function=None,
+                                      boundary=0.01, remove_outliers=False,
+                                      **kwargs):
+    return _distribution_match(
+        df, match_column, max_deviances,
+        "hard_coded_boundary",
+        min_percent_match=min_percent_match,
+        distance_function=distance_function,
+        boundary=boundary,
+        remove_outliers=remove_outliers,
+        **kwargs
+    )
 
 def distribution_match_cdf_mean_absolute_deviation(df,
                                                    match_column,
                                                    max_deviances,
                                                    min_percent_match=0.9,
                                                    distance_function=None,
-                                                   remove_outliers=False):
-    groups, classes = get_groups_classes(
-        df, match_column
-    )
-    class_combinations = list(combinations(classes, 2))
-    percent_matches_per_class_per_column = []
-    for index, combination in enumerate(combinations(groups, 2)):
-        first = combination[0]
-        second = combination[1]
-        for column in columns:
-            max_deviance = max_deviances[column]
-            percent_match = compare_cdf_mean_absolute_deviation(
-                first[column],
-                second[column],
-                max_deviance,
-                distance_function=distance_function,
-                remove_outliers=remove_outliers
-            )
-            percent_matches_per_class_per_column.append(
-                percent_match,
-                class_combinations[index],
-                column
-            )
-    return get_percent_matches(
-        percent_matches_per_class_per_column,
-        min_percent_match
+                                                   remove_outliers=False,
+                                                   **kwargs):
+    return _distribution_match(
+        df, match_column, max_deviances,
+        "mean_absolute_deviation",
+        min_percent_match=min_percent_match,
+        distance_function=distance_function,
+        remove_outliers=remove_outliers,
+        **kwargs
     )
 
 def distribution_match_cdf_median_absolute_deviation(df,
@@ -214,32 +271,15 @@ def distribution_match_cdf_median_absolute_deviation(df,
                                                      max_deviances,
                                                      min_percent_match=0.9,
                                                      distance_function=None,
-                                                     remove_outliers=False):
-    groups, classes = get_groups_classes(
-        df, match_column
-    )
-    class_combinations = list(combinations(classes, 2))
-    percent_matches_per_class_per_column = []
-    for index, combination in enumerate(combinations(groups, 2)):
-        first = combination[0]
-        second = combination[1]
-        for column in columns:
-            max_deviance = max_deviances[column]
-            percent_match = compare_cdf_median_absolute_deviation(
-                first[column],
-                second[column],
-                max_deviance,
-                distance_function=distance_function,
-                remove_outliers=remove_outliers
-            )
-            percent_matches_per_class_per_column.append(
-                percent_match,
-                class_combinations[index],
-                column
-            )
-    return get_percent_matches(
-        percent_matches_per_class_per_column,
-        min_percent_match
+                                                     remove_outliers=False,
+                                                     **kwargs):
+    return _distribution_match(
+        df, match_column, max_deviances,
+        "median_absolute_deviation",
+        min_percent_match=min_percent_match,
+        distance_function=distance_function,
+        remove_outliers=remove_outliers,
+        **kwargs
     )
 
 def distribution_match_cdf_trimean_absolute_deviation(df,
@@ -247,30 +287,38 @@ def distribution_match_cdf_trimean_absolute_deviation(df,
                                                       max_deviances,
                                                       min_percent_match=0.9,
                                                       distance_function=None,
-                                                      remove_outliers=False):
-    groups, classes = get_groups_classes(
-        df, match_column
+                                                      remove_outliers=False,
+                                                      **kwargs):
+    return _distribution_match(
+        df, match_column, max_deviances,
+        "trimean_absolute_deviation",
+        min_percent_match=min_percent_match,
+        distance_function=distance_function,
+        remove_outliers=remove_outliers,
+        **kwargs
     )
-    class_combinations = list(combinations(classes, 2))
-    percent_matches_per_class_per_column = []
-    for index, combination in enumerate(combinations(groups, 2)):
-        first = combination[0]
-        second = combination[1]
-        for column in columns:
-            max_deviance = max_deviances[column]
-            percent_match = compare_cdf_trimean_absolute_deviation(
-                first[column],
-                second[column],
-                max_deviance,
-                distance_function=distance_function,
-                remove_outliers=remove_outliers
-            )
-            percent_matches_per_class_per_column.append(
-                percent_match,
-                class_combinations[index],
+
+def distribution_match_two_sample(df, match_column, test="ks", min_pvalue=0.05):
+    """
+    The (class pair, column)s whose distributions a two sample test
+    can't tell apart, p-value > min_pvalue, in the same form as
+    distribution_match_cdf_*.  No max_deviance to choose.
+
+    @test - "ks" (Kolmogorov-Smirnov) or "anderson" (Anderson-Darling),
+    see describer_ml.matching.two_sample for the statistic and p-value
+    matrices themselves
+    """
+    grouped = GroupedFrame(df, match_column)
+    pvalues = [
+        pairwise_two_sample(grouped.column(column), grouped.offsets, test=test).pvalue
+        for column in grouped.columns
+    ]
+    percent_matches = []
+    for first, second in combinations(range(len(grouped.classes)), 2):
+        for column_index, column in enumerate(grouped.columns):
+            percent_matches.append((
+                pvalues[column_index][first, second],
+                (grouped.classes[first], grouped.classes[second]),
                 column
-            )
-    return get_percent_matches(
-        percent_matches_per_class_per_column,
-        min_percent_match
-    )
+            ))
+    return get_percent_matches(percent_matches, min_pvalue)
@@ -0,0 +1,229 @@
+from itertools import combinations
+import numpy as np
+from describer_ml._lazy import lazy_import
+from describer_ml.matching.grouped import GroupedFrame
+from describer_ml.matching.match import get_matches, get_percent_matches
+from describer_ml.numeric.num_stats import ReferenceDistribution
+from describer_ml.numeric.sketch import QuantileSketch
+from describer_ml.numeric.streaming import MomentAccumulator
+
+pd = lazy_import("pandas")
+parquet = lazy_import("pyarrow.parquet", extra="parquet")
+
+# the share of memory_budget for the chunk being read,
+# the rest is for the per class summaries
+CHUNK_FRACTION = 0.5
+# bytes a parsed row takes per column, with pandas' overhead
+BYTES_PER_VALUE = 32
+
+# statistics from the moments, exact; pandas skips NaN for the first three
+MOMENT_STATS = ["mean", "variance", "standard_deviation", "skew", "kurtosis", "variation"]
+# statistics from the quantile sketch, approximate; pandas skips NaN
+# for the median
+SKETCH_STATS = ["median", "trimean", "midhinge", "interquartile_range"]
+# statistics from the sketch's weighted items, approximate
+TABLE_STATS = [
+    "entropy", "mean_absolute_deviation",
+    "median_absolute_deviation", "trimean_absolute_deviation"
+]
+
+def _is_parquet(path):
+    return str(path).endswith((".parquet", ".pq"))
+
+def read_columns(path):
+    if _is_parquet(path):
+        return parquet.ParquetFile(path).schema_arrow.names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+def read_chunks(path, chunk_rows, columns=None):
+    """
+    Yields the rows of a Parquet or CSV file as DataFrames of at most
+    chunk_rows rows, so only one chunk is in memory at a time.
+    """
+    if _is_parquet(path):
+        parquet_file = parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows, usecols=columns)
+
+class ClassSummary:
+    """
+    What the chunked matcher keeps for one class and column:
+    the moments, a quantile sketch and whether any NaN was seen.
+    """
+    def __init__(self, k=200, seed=None):
+        self.moments = MomentAccumulator(ignore_nan=True)
+        self.sketch = QuantileSketch(k=k, seed=seed)
+        self.has_nan = False
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=float)
+        self.has_nan = self.has_nan or bool(np.isnan(chunk).any())
+        self.moments.update(chunk)
+        self.sketch.update(chunk)
+        return self
+
+    @property
+    def nbytes(self):
+        # eight bytes per retained item, plus the fixed overhead
+        return 8 * self.sketch.num_retained + 1024
+
+    def statistic(self, stat):
+        # as matching.aggregate, pandas skips NaN for these
+        if stat in ("mean", "variance", "standard_deviation"):
+            return getattr(self.moments, stat)()
+        if stat == "median":
+            # the sketch never holds NaN
+            return self.sketch.median()
+        if self.has_nan:
+            return np.nan
+        if stat in MOMENT_STATS:
+            return getattr(self.moments, stat)()
+        if stat in SKETCH_STATS:
+            return getattr(self.sketch, stat)()
+        if stat not in TABLE_STATS:
+            raise ValueError("Statistic not available out of core: {}".format(stat))
+        return getattr(self.sketch.to_frequency_table(), stat)()
+
+class ChunkedMatcher:
+    """
+    get_multi_matches and distribution_match_cdf_* for data too big
+    for memory, read from Parquet or CSV a chunk at a time.
+
+    Every class and column is summarised by a ClassSummary, so memory
+    is the chunk being read plus a fixed amount per class and column
+    however many rows there are.  Moment statistics are exact, order
+    statistics and CDFs come from a QuantileSketch (see its rank error
+    guarantee), and mode is not available.
+
+    @match_column - the column holding the class labels
+    @memory_budget - bytes; CHUNK_FRACTION of it sizes the chunks read
+    and MemoryError is raised once the summaries outgrow the rest,
+    in which case lower k
+    @k - the accuracy of the sketches, see QuantileSketch
+    """
+    def __init__(self, match_column, memory_budget=2**30, k=200, seed=None):
+        self.match_column = match_column
+        self.memory_budget = memory_budget
+        self.k = k
+        self.seed = seed
+        self.columns = []
+        self.summaries = {}
+
+    @property
+    def classes(self):
+        return sorted({label for label, _ in self.summaries})
+
+    @property
+    def nbytes(self):
+        return sum(summary.nbytes for summary in self.summaries.values())
+
+    def chunk_rows(self, n_columns):
+        return max(1, int(
+            self.memory_budget * CHUNK_FRACTION // (BYTES_PER_VALUE * max(n_columns, 1))
+        ))
+
+    def update(self, df):
+        """
+        Adds one chunk of rows.
+        """
+        grouped = GroupedFrame(df, self.match_column)
+        for column in grouped.columns:
+            if column not in self.columns:
+                self.columns.append(column)
+        for group in grouped.groups():
+            for column in grouped.columns:
+                key = (group.label, column)
+                if key not in self.summaries:
+                    self.summaries[key] = ClassSummary(k=self.k, seed=self.seed)
+                self.summaries[key].update(group[column])
+        if self.nbytes > self.memory_budget * (1 - CHUNK_FRACTION):
+            raise MemoryError(
+                "Class summaries take {} bytes, over the budget; "
+                "lower k or raise memory_budget".format(self.nbytes)
+            )
+        return self
+
+    def fit(self, path, columns=None):
+        """
+        Reads a Parquet (.parquet, .pq) or CSV file chunk by chunk.
+        Parquet needs pyarrow, the parquet extra.
+        @columns - the columns to match on, by default all of them
+        """
+        if columns is not None:
+            columns = list(columns)
+            if self.match_column not in columns:
+                columns.append(self.match_column)
+        n_columns = len(columns if columns is not None else read_columns(path))
+        for chunk in read_chunks(path, self.chunk_rows(n_columns), columns=columns):
+            self.update(chunk)
+        return self
+
+    def per_class(self, stat):
+        """
+        The class by column table of one statistic.
+        """
+        return pd.DataFrame(
+            [[self.summaries[(label, column)].statistic(stat)
+              if (label, column) in self.summaries else np.nan
+              for column in self.columns]
+             for label in self.classes],
+            index=self.classes, columns=self.columns
+        )
+
+    def multi_matches(self, max_diffs):
+        return {
+            stat: get_matches(self.per_class(stat), max_diff)
+            for stat, max_diff in max_diffs.items()
+        }
+
+    def multi_matching_columns(self, max_diffs):
+        matches = [set(columns) for columns in self.multi_matches(max_diffs).values()]
+        return list(matches[0].intersection(*matches[1:]))
+
+    def distribution_matches(self, max_deviances,
+                             spread="mean_absolute_deviation",
+                             min_percent_match=0.9,
+                             boundary=0.01,
+                             distance_function=None):
+        """
+        distribution_match_cdf_* on the sketches.
+
+        The score is the share of the reference's values, rather than
+        its distinct values, within boundary of the candidate.  The two
+        agree when the values are distinct; a sketch can't tell how
+        many distinct values an item stands in for.
+        """
+        tables = {
+            key: summary.sketch.to_frequency_table()
+            for key, summary in self.summaries.items()
+        }
+        references = {
+            key: ReferenceDistribution(
+                table, max_deviances[key[1]],
+                spread=spread,
+                boundary=boundary,
+                distance_function=distance_function,
+                remove_outliers=False
+            )
+            for key, table in tables.items()
+        }
+        percent_matches = []
+        for class_combination in combinations(self.classes, 2):
+            first, second = class_combination
+            for column in self.columns:
+                if (first, column) not in tables or (second, column) not in tables:
+                    continue
+                reference = references[(first, column)]
+                within_boundary = reference.cdf.within_boundary(
+                    references[(second, column)].cdf,
+                    reference.spread, max_deviances[column],
+                    distance_function=distance_function
+                )
+                table = tables[(first, column)]
+                percent_matches.append((
+                    table.counts[within_boundary].sum() / table.count,
+                    class_combination, column
+                ))
+        return get_percent_matches(percent_matches, min_percent_match)
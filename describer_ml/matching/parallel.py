@@ -0,0 +1,141 @@
+import os
+import tempfile
+from concurrent.futures import (
+    CancelledError, FIRST_COMPLETED,
+    ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
+import numpy as np
+from describer_ml.numeric.num_stats import ReferenceDistribution
+
+EXECUTORS = {
+    "serial": None,
+    "thread": ThreadPoolExecutor,
+    "process": ProcessPoolExecutor
+}
+
+def _pair_row(first, second, n_classes):
+    """
+    The position of (first, second) in combinations(range(n_classes), 2).
+    """
+    return first * (2 * n_classes - first - 1) // 2 + second - first - 1
+
+def _score_chunk(source, offsets, units, max_deviances, options, cancel_event=None):
+    """
+    Scores the classes seconds against class first, for each
+    (column, first, seconds) unit.  source is the (columns, rows)
+    array, or the path of a .npy file holding it, which is memory-mapped
+    rather than read so worker processes share the page cache instead
+    of copies.
+    """
+    values = np.load(source, mmap_mode="r") if isinstance(source, str) else source
+    scores = []
+    for column, first, seconds in units:
+        if cancel_event is not None and cancel_event.is_set():
+            raise CancelledError()
+        reference = ReferenceDistribution(
+            values[column, offsets[first]:offsets[first + 1]],
+            max_deviances[column],
+            **options
+        )
+        scores.append(reference.compare(
+            values[column, offsets[second]:offsets[second + 1]]
+            for second in seconds
+        ))
+    return scores
+
+def _collect(futures, cancel_event):
+    pending = set(futures)
+    while pending:
+        if cancel_event is not None and cancel_event.is_set():
+            raise CancelledError("distribution match cancelled")
+        done, pending = wait(
+            pending,
+            timeout=None if cancel_event is None else 0.1,
+            return_when=FIRST_COMPLETED
+        )
+        for future in done:
+            # surface worker errors straight away
+            future.result()
+    return [future.result() for future in futures]
+
+def score_pairs(values, offsets, max_deviances, options,
+                executor="serial", n_jobs=None, chunk_size=None,
+                candidates=None, cancel_event=None, mmap_dir=None):
+    """
+    Scores every pair of classes on every column with
+    ReferenceDistribution, the first class of the pair as reference.
+
+    The (pair, column) grid is split into chunks of (column, class)
+    units, each scoring one reference against the classes after it,
+    so the reference is prepared once per unit.
+
+    @values, @offsets - see grouped.GroupedFrame
+    @max_deviances - one max_deviance per column
+    @options - keyword arguments for ReferenceDistribution
+    @executor - "serial", "thread" or "process".  For processes the
+    values are written once to a .npy file in mmap_dir (the default
+    temporary directory if None) which the workers memory-map, rather
+    than pickling the groups for every task; options must be picklable.
+    @n_jobs - workers, None lets the executor decide
+    @chunk_size - units per task, by default about four tasks per worker
+    @candidates - {(column, first): array of the classes after first
+    to score against it}, e.g. from pruning.candidate_pairs.  None
+    scores every pair.
+    @cancel_event - a threading.Event; once set, pending chunks are
+    cancelled and CancelledError is raised.  Thread workers stop at the
+    next unit, process workers finish the chunk they are on.
+
+    Returns a (pairs, columns) array, pairs in the order of
+    itertools.combinations(range(n_classes), 2), whatever the executor.
+    Pairs left out of candidates are NaN.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError("Unknown executor: {}".format(executor))
+    n_columns = values.shape[0]
+    n_classes = len(offsets) - 1
+    units = []
+    for first in range(n_classes - 1):
+        for column in range(n_columns):
+            if candidates is None:
+                seconds = np.arange(first + 1, n_classes)
+            else:
+                seconds = candidates.get((column, first), ())
+            if len(seconds):
+                units.append((column, first, np.asarray(seconds)))
+    if executor == "serial":
+        chunks = [units]
+        results = [_score_chunk(values, offsets, units, max_deviances, options, cancel_event)]
+    else:
+        workers = n_jobs or os.cpu_count() or 1
+        if chunk_size is None:
+            chunk_size = max(1, -(-len(units) // (workers * 4)))
+        chunks = [units[start:start + chunk_size] for start in range(0, len(units), chunk_size)]
+        with tempfile.TemporaryDirectory(dir=mmap_dir) as directory:
+            source = values
+            worker_event = cancel_event
+            if executor == "process":
+                source = os.path.join(directory, "values.npy")
+                np.save(source, values)
+                # threading.Event does not pickle, workers are
+                # stopped between chunks instead
+                worker_event = None
+            pool = EXECUTORS[executor](max_workers=n_jobs)
+            futures = []
+            try:
+                for chunk in chunks:
+                    futures.append(pool.submit(
+                        _score_chunk, source, offsets, chunk,
+                        max_deviances, options, worker_event
+                    ))
+                results = _collect(futures, cancel_event)
+            finally:
+                # shutdown's cancel_futures needs Python 3.9
+                for future in futures:
+                    future.cancel()
+                pool.shutdown(wait=True)
+
+    scores = np.full((n_classes * (n_classes - 1) // 2, n_columns), np.nan)
+    for chunk, chunk_scores in zip(chunks, results):
+        for (column, first, seconds), unit_scores in zip(chunk, chunk_scores):
+            scores[_pair_row(first, seconds, n_classes), column] = unit_scores
+    return scores
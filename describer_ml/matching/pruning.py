@@ -0,0 +1,100 @@
+import warnings
+from collections import namedtuple
+import numpy as np
+
+PruningStats = namedtuple(
+    "PruningStats",
+    "cells pruned_by_signature pruned_by_range pruned_by_bound compared"
+)
+
+# the tolerances of np.isclose, which ECDF.compare_indices also accepts
+RTOL, ATOL = 1e-05, 1e-08
+
+def _signatures(values, offsets):
+    """
+    Per class, the sorted distinct non-NaN values of one column,
+    their smallest and largest, and the number of rows.
+    """
+    distinct = []
+    for first in range(len(offsets) - 1):
+        group = values[offsets[first]:offsets[first + 1]]
+        distinct.append(np.unique(group[~np.isnan(group)]))
+    lows = np.array([xs[0] if len(xs) else np.nan for xs in distinct])
+    highs = np.array([xs[-1] if len(xs) else np.nan for xs in distinct])
+    return distinct, lows, highs, np.diff(offsets)
+
+def candidate_pairs(values, offsets, max_deviances, min_percent_match):
+    """
+    The pairs of classes, per column, which can possibly score more
+    than min_percent_match in ReferenceDistribution.score, so the rest
+    can be skipped without changing the result.
+
+    A reference value can only count if the candidate has a value
+    within max_deviance of it (or np.isclose to it), so the score of
+    reference A against candidate B is at most
+
+        |distinct values of A within [min(B) - w, max(B) + w]| / |A|
+
+    where w is max_deviance widened by the isclose tolerance.  Three
+    stages use that bound, each cheaper than the next:
+
+    * signature - a reference with no more distinct values than
+      min_percent_match of its rows can't match anything
+    * range - classes sorted by their smallest value; a sliding window
+      (one searchsorted) finds the candidates whose widened range
+      overlaps the reference's at all
+    * bound - for those, the bound above with two searchsorted calls
+      on the reference's distinct values
+
+    Only valid for the default distance and without outlier removal,
+    which changes the values compared.
+
+    @values, @offsets - see grouped.GroupedFrame
+    @max_deviances - one max_deviance per column
+
+    Returns candidates, {(column, first): array of the classes after
+    first still to compare}, and PruningStats counting
+    (class pair, column) cells.
+    """
+    n_columns = values.shape[0]
+    n_classes = len(offsets) - 1
+    candidates = {}
+    pruned_by_signature = pruned_by_range = pruned_by_bound = 0
+    for column in range(n_columns):
+        distinct, lows, highs, counts = _signatures(values[column], offsets)
+        with warnings.catch_warnings():
+            # columns which are entirely NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            max_abs = np.nanmax(np.abs(np.concatenate([lows, highs])))
+        if np.isnan(max_abs):
+            max_abs = 0.0
+        # widened a little further so rounding can only keep a pair
+        width = (max_deviances[column] + ATOL + RTOL * max_abs) * (1 + 1e-9)
+
+        order = np.argsort(lows)
+        sorted_lows = lows[order]
+        for first in range(n_classes - 1):
+            later = n_classes - first - 1
+            if len(distinct[first]) <= min_percent_match * counts[first]:
+                pruned_by_signature += later
+                continue
+            in_window = order[:np.searchsorted(sorted_lows, highs[first] + width, side="right")]
+            overlapping = np.sort(in_window[
+                (in_window > first) & (highs[in_window] >= lows[first] - width)
+            ])
+            pruned_by_range += later - len(overlapping)
+            xs = distinct[first]
+            reachable = (
+                np.searchsorted(xs, highs[overlapping] + width, side="right") -
+                np.searchsorted(xs, lows[overlapping] - width, side="left")
+            )
+            possible = overlapping[reachable > min_percent_match * counts[first]]
+            pruned_by_bound += len(overlapping) - len(possible)
+            if len(possible):
+                candidates[(column, first)] = possible
+    cells = n_columns * n_classes * (n_classes - 1) // 2
+    stats = PruningStats(
+        cells, pruned_by_signature, pruned_by_range, pruned_by_bound,
+        cells - pruned_by_signature - pruned_by_range - pruned_by_bound
+    )
+    return candidates, stats
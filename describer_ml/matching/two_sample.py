@@ -0,0 +1,233 @@
+from collections import namedtuple
+import numpy as np
+from describer_ml._lazy import lazy_import
+from describer_ml.matching.grouped import GroupedFrame
+
+pd = lazy_import("pandas")
+stats = lazy_import("scipy.stats")
+
+TwoSampleResult = namedtuple("TwoSampleResult", "statistic pvalue")
+
+TESTS = ("ks", "anderson")
+
+# Scholz and Stephens (1987) Table 2 interpolation coefficients, as in
+# scipy.stats.anderson_ksamp; for two samples m = k - 1 = 1
+_AD_CRITICAL = (
+    np.array([0.675, 1.281, 1.645, 1.96, 2.326, 2.573, 3.085]) +
+    np.array([-0.245, 0.25, 0.678, 1.149, 1.822, 2.364, 3.615]) +
+    np.array([-0.105, -0.305, -0.362, -0.391, -0.396, -0.345, -0.154])
+)
+_AD_SIGNIFICANCE = np.array([0.25, 0.1, 0.05, 0.025, 0.01, 0.005, 0.001])
+
+class ClassRanks:
+    """
+    The shared rank structure for one column.  The column is sorted
+    once, equal values form tie blocks numbered in order, and each
+    class is reduced to the sorted blocks it has values in with its
+    cumulative count before and after each of them.  NaN values are
+    dropped.
+
+    The per class arrays are concatenated, class i taking
+    [starts[i], starts[i + 1]), so a statistic can be evaluated for
+    one class against every other class in a single vectorized pass.
+
+    @values, @offsets - one column of a GroupedFrame and its offsets
+    """
+    def __init__(self, values, offsets):
+        n_classes = len(offsets) - 1
+        codes = np.repeat(np.arange(n_classes), np.diff(offsets))
+        keep = ~np.isnan(values)
+        values, codes = values[keep], codes[keep]
+        order = np.argsort(values, kind="stable")
+        sorted_values = values[order]
+        block = np.concatenate([[0], np.cumsum(sorted_values[1:] != sorted_values[:-1])])[:len(values)]
+        # class major, still in value order within each class
+        by_class = np.argsort(codes[order], kind="stable")
+        class_blocks = block[by_class]
+        class_codes = codes[order][by_class]
+        new_run = np.concatenate([[True], (class_blocks[1:] != class_blocks[:-1]) |
+                                          (class_codes[1:] != class_codes[:-1])])[:len(values)]
+        starts = np.flatnonzero(new_run)
+        self.blocks = class_blocks[starts]
+        self.codes = class_codes[starts]
+        self.sizes = np.bincount(codes, minlength=n_classes).astype(float)
+        run_counts = np.diff(np.append(starts, len(class_blocks)))
+        self.starts = np.searchsorted(self.codes, np.arange(n_classes + 1))
+        cumulative = np.cumsum(run_counts)
+        class_before = np.concatenate([[0], cumulative])[self.starts[:-1]]
+        self.right = cumulative - class_before[self.codes]
+        self.left = self.right - run_counts
+
+    def counts_at(self, index, blocks):
+        """
+        How many values of class index are before, and up to and
+        including, each block.
+        """
+        start, stop = self.starts[index], self.starts[index + 1]
+        class_blocks = self.blocks[start:stop]
+        cumulative = np.concatenate([[0], self.right[start:stop]])
+        return (
+            cumulative[np.searchsorted(class_blocks, blocks, side="left")],
+            cumulative[np.searchsorted(class_blocks, blocks, side="right")]
+        )
+
+def _segment_reduce(function, values, ranks, present):
+    result = np.full(len(ranks.sizes), np.nan)
+    result[present] = function.reduceat(values, ranks.starts[:-1][present])
+    return result
+
+def _ks_statistics(ranks, present):
+    """
+    D for every pair.  The ECDFs of a pair only step at the blocks of
+    one or the other, so D is the larger of the two one sided maxima,
+    each found for one class against all the others at once.
+    """
+    n_classes = len(ranks.sizes)
+    one_sided = np.full((n_classes, n_classes), np.nan)
+    own = ranks.right / ranks.sizes[ranks.codes]
+    for index in np.flatnonzero(present):
+        _, right = ranks.counts_at(index, ranks.blocks)
+        one_sided[index] = _segment_reduce(
+            np.maximum, np.abs(right / ranks.sizes[index] - own), ranks, present
+        )
+    return np.fmax(one_sided, one_sided.T)
+
+def _ad_harmonics(N):
+    """
+    The harmonic sums h and g in the variance of the Anderson-Darling
+    statistic for N values, see scipy.stats.anderson_ksamp.
+    """
+    harmonic = np.cumsum(1 / np.arange(N - 1, 1, -1))
+    h = harmonic[-1] + 1
+    g = np.sum(harmonic / np.arange(2, N))
+    return h, g
+
+def _ad_statistics(ranks, present):
+    """
+    The standardized midrank Anderson-Darling statistic of
+    scipy.stats.anderson_ksamp for every pair.  Its sum over the blocks
+    of a pair is split into the blocks of the second class, found in
+    the pass for the first, and the blocks only the first class has,
+    found in the pass for the second.
+    """
+    n_classes = len(ranks.sizes)
+    every_block = np.full((n_classes, n_classes), np.nan)
+    only_other = np.full((n_classes, n_classes), np.nan)
+    degenerate = np.zeros((n_classes, n_classes), dtype=bool)
+    other_sizes = ranks.sizes[ranks.codes]
+    for index in np.flatnonzero(present):
+        left, right = ranks.counts_at(index, ranks.blocks)
+        size = ranks.sizes[index]
+        N = size + other_sizes
+        ties = (right - left) + (ranks.right - ranks.left)
+        below = left + ranks.left + ties / 2
+        denominator = below * (N - below) - N * ties / 4
+        with np.errstate(divide="ignore", invalid="ignore"):
+            term = ties / N * (
+                (N * (right - (right - left) / 2) - below * size)**2 / size +
+                (N * (ranks.right - (ranks.right - ranks.left) / 2) - below * other_sizes)**2 /
+                other_sizes
+            ) / denominator
+        every_block[index] = _segment_reduce(np.add, term, ranks, present)
+        only_other[index] = _segment_reduce(np.add, np.where(right == left, term, 0), ranks, present)
+        degenerate[index] = _segment_reduce(np.maximum, (denominator == 0).astype(float), ranks, present) > 0
+    statistic = every_block.T + only_other
+    # the two halves add up the same terms in a different order, so
+    # copy one over the other to be exactly symmetric
+    lower = np.tril_indices(n_classes, -1)
+    statistic[lower] = statistic.T[lower]
+    degenerate = degenerate | degenerate.T
+
+    n_one = ranks.sizes[:, np.newaxis]
+    n_two = ranks.sizes[np.newaxis, :]
+    N = n_one + n_two
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = statistic * (N - 1) / N
+        H = 1 / n_one + 1 / n_two
+    h = np.full(N.shape, np.nan)
+    g = np.full(N.shape, np.nan)
+    for total in np.unique(N[np.isfinite(N) & (N >= 4)]):
+        h[N == total], g[N == total] = _ad_harmonics(int(total))
+    k = 2
+    a = (4*g - 6) * (k - 1) + (10 - 6*g)*H
+    b = (2*g - 4)*k**2 + 8*h*k + (2*g - 14*h - 4)*H - 8*h + 4*g - 6
+    c = (6*h + 2*g - 2)*k**2 + (4*h - 4*g + 6)*k + (2*h - 6)*H + 4*h
+    d = (2*h + 6)*k**2 - 4*h*k
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = (a*N**3 + b*N**2 + c*N + d) / ((N - 1) * (N - 2) * (N - 3))
+        statistic = (statistic - 1) / np.sqrt(variance)
+    statistic[degenerate | (N < 4)] = np.nan
+    return statistic
+
+def _anderson_pvalue(statistic):
+    """
+    As scipy.stats.anderson_ksamp, interpolated from the critical
+    values and capped to [0.001, 0.25].
+    """
+    fit = np.polyfit(_AD_CRITICAL, np.log(_AD_SIGNIFICANCE), 2)
+    pvalue = np.exp(np.polyval(fit, statistic))
+    pvalue = np.where(statistic < _AD_CRITICAL.min(), _AD_SIGNIFICANCE.max(), pvalue)
+    pvalue = np.where(statistic > _AD_CRITICAL.max(), _AD_SIGNIFICANCE.min(), pvalue)
+    return np.where(np.isnan(statistic), np.nan, pvalue)
+
+def _ks_pvalue(statistic, sizes):
+    """
+    scipy.stats.ks_2samp's two sided asymptotic p-value
+    (method="asymp").  kstwo.sf is slow, so it is evaluated once
+    per distinct (D, effective size) rather than per pair.
+    """
+    n_one = sizes[:, np.newaxis]
+    n_two = sizes[np.newaxis, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        effective = np.round(n_one * n_two / (n_one + n_two))
+    pvalue = np.full(statistic.shape, np.nan)
+    valid = ~np.isnan(statistic)
+    distinct, inverse = np.unique(
+        np.stack([statistic[valid], effective[valid]]), axis=1, return_inverse=True
+    )
+    if distinct.size:
+        pvalue[valid] = np.clip(stats.kstwo.sf(distinct[0], distinct[1]), 0, 1)[inverse.ravel()]
+    return pvalue
+
+def pairwise_two_sample(values, offsets, test="ks"):
+    """
+    The two sample test statistic and p-value of every pair of
+    classes for one column, from one sort of the column
+    (see ClassRanks) rather than a sort per pair.
+
+    @test - "ks" (Kolmogorov-Smirnov) or "anderson" (Anderson-Darling)
+
+    Returns TwoSampleResult of (classes, classes) arrays, symmetric,
+    with NaN on the diagonal and for classes with no values.
+    KS p-values are scipy.stats.ks_2samp's asymptotic ones, Anderson-
+    Darling statistics and p-values match scipy.stats.anderson_ksamp.
+    """
+    if test not in TESTS:
+        raise ValueError("Unknown test: {}".format(test))
+    ranks = ClassRanks(values, offsets)
+    present = ranks.sizes > 0
+    if test == "ks":
+        statistic = _ks_statistics(ranks, present)
+    else:
+        statistic = _ad_statistics(ranks, present)
+    np.fill_diagonal(statistic, np.nan)
+    if test == "ks":
+        pvalue = _ks_pvalue(statistic, ranks.sizes)
+    else:
+        pvalue = _anderson_pvalue(statistic)
+    return TwoSampleResult(statistic, pvalue)
+
+def two_sample_matrices(df, match_column, test="ks"):
+    """
+    pairwise_two_sample for every column of df, as
+    {column: TwoSampleResult of class by class DataFrames}.
+    """
+    grouped = GroupedFrame(df, match_column)
+    results = {}
+    for column in grouped.columns:
+        result = pairwise_two_sample(grouped.column(column), grouped.offsets, test=test)
+        results[column] = TwoSampleResult(*[
+            pd.DataFrame(matrix, index=grouped.classes, columns=grouped.classes)
+            for matrix in result
+        ])
+    return results
@@ -0,0 +1,155 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from describer_ml._lazy import lazy_import
+from describer_ml.numeric import num_stats
+
+stats = lazy_import("scipy.stats")
+
+BootstrapResult = namedtuple(
+    "BootstrapResult",
+    "low high estimate standard_error bootstrap_distribution"
+)
+
+def _get_statistic(statistic):
+    if isinstance(statistic, str):
+        return getattr(num_stats, statistic)
+    return statistic
+
+# resamples drawn from one child seed.  Batches are whole blocks, so
+# which resamples are drawn doesn't depend on how they are batched
+RESAMPLES_PER_SEED = 32
+
+def _bootstrap_batches(data, statistic, seeds, block_sizes, blocks_per_batch):
+    """
+    Evaluates statistic on blocks of resamples, block i drawn from
+    seeds[i], blocks_per_batch blocks at a time as one
+    (resamples, n) index matrix.
+    """
+    statistic = _get_statistic(statistic)
+    results = []
+    for start in range(0, len(seeds), blocks_per_batch):
+        indices = np.concatenate([
+            np.random.default_rng(seed).integers(0, len(data), size=(block_size, len(data)))
+            for seed, block_size in zip(
+                seeds[start:start + blocks_per_batch],
+                block_sizes[start:start + blocks_per_batch]
+            )
+        ])
+        results.append(np.asarray(statistic(data[indices], axis=1), dtype=float))
+    return np.concatenate(results)
+
+def _split(items, parts):
+    return [chunk for chunk in np.array_split(np.arange(len(items)), parts) if len(chunk)]
+
+def _jackknife(data, statistic, groups, rng):
+    """
+    Leave-one-out estimates of statistic, or for more than groups
+    values, delete-a-group estimates over a random partition into
+    groups equal-ish parts, which keeps BCa affordable on large data.
+    """
+    order = rng.permutation(len(data))
+    estimates = []
+    for removed in np.array_split(order, min(groups, len(data))):
+        kept = np.ones(len(data), dtype=bool)
+        kept[removed] = False
+        estimates.append(statistic(data[kept]))
+    return np.asarray(estimates, dtype=float)
+
+def _bca_interval(data, statistic, estimate, distribution, alpha,
+                  jackknife_groups, rng):
+    norm = stats.norm
+    proportion_below = (
+        np.mean(distribution < estimate) +
+        np.mean(distribution == estimate) / 2
+    )
+    bias = norm.ppf(proportion_below)
+    jackknife = _jackknife(data, statistic, jackknife_groups, rng)
+    deviations = jackknife.mean() - jackknife
+    with np.errstate(divide="ignore", invalid="ignore"):
+        acceleration = (
+            np.sum(deviations**3) /
+            (6 * np.sum(deviations**2)**1.5)
+        )
+    if not np.isfinite(acceleration):
+        acceleration = 0.0
+    z = norm.ppf([alpha/2, 1 - alpha/2])
+    adjusted = norm.cdf(bias + (bias + z) / (1 - acceleration * (bias + z)))
+    return np.percentile(distribution, adjusted * 100)
+
+def bootstrap(array, statistic,
+              n_resamples=9999,
+              confidence_level=0.95,
+              method="percentile",
+              max_batch_elements=2**22,
+              n_jobs=None,
+              jackknife_groups=200,
+              random_state=None):
+    """
+    Bootstrap confidence interval for any num_stats statistic.
+
+    Resamples are drawn as (batch, n) index matrices and the statistic
+    is evaluated along axis=1 of each batch in one call, instead of a
+    Python loop over resamples.  Batches are sized so one holds at most
+    max_batch_elements values, but never less than a block of
+    RESAMPLES_PER_SEED resamples.
+
+    @statistic - a num_stats function name, e.g. "trimean", or a
+    function taking (array, axis=...) like the num_stats functions.
+    With n_jobs it must be picklable, so no lambdas.
+    @method - "percentile" or "bca" (bias-corrected and accelerated,
+    Efron 1987).  For BCa the acceleration comes from a jackknife,
+    which for more than jackknife_groups values deletes groups of
+    values rather than one value at a time.
+    @n_jobs - split the batches across this many processes
+    @random_state - seed; results are identical for a given seed
+    whatever n_jobs and max_batch_elements are, each block of
+    RESAMPLES_PER_SEED resamples has its own child seed.
+
+    Returns a BootstrapResult.
+    """
+    if method not in ("percentile", "bca"):
+        raise ValueError("Unknown method: {}".format(method))
+    data = np.asarray(array, dtype=float).ravel()
+    statistic_function = _get_statistic(statistic)
+    estimate = float(statistic_function(data))
+
+    block_sizes = [RESAMPLES_PER_SEED] * (n_resamples // RESAMPLES_PER_SEED)
+    if n_resamples % RESAMPLES_PER_SEED:
+        block_sizes.append(n_resamples % RESAMPLES_PER_SEED)
+    blocks_per_batch = max(1, max_batch_elements // (RESAMPLES_PER_SEED * max(len(data), 1)))
+    seed_sequence = np.random.SeedSequence(random_state)
+    jackknife_seed, *seeds = seed_sequence.spawn(len(block_sizes) + 1)
+    jackknife_rng = np.random.default_rng(jackknife_seed)
+
+    if n_jobs is None or n_jobs == 1:
+        distribution = _bootstrap_batches(
+            data, statistic, seeds, block_sizes, blocks_per_batch
+        )
+    else:
+        parts = _split(block_sizes, n_jobs)
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [
+                executor.submit(
+                    _bootstrap_batches, data, statistic,
+                    [seeds[index] for index in part],
+                    [block_sizes[index] for index in part],
+                    blocks_per_batch
+                )
+                for part in parts
+            ]
+            distribution = np.concatenate([future.result() for future in futures])
+
+    alpha = 1 - confidence_level
+    if method == "percentile":
+        low, high = np.percentile(distribution, [alpha/2 * 100, (1 - alpha/2) * 100])
+    else:
+        low, high = _bca_interval(
+            data, statistic_function, estimate, distribution,
+            alpha, jackknife_groups, jackknife_rng
+        )
+    return BootstrapResult(
+        low, high, estimate,
+        np.std(distribution, ddof=1),
+        distribution
+    )
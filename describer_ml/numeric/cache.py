@@ -0,0 +1,133 @@
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+def _update_digest(digest, array):
+    array = np.ascontiguousarray(array)
+    digest.update(str(array.dtype).encode())
+    digest.update(str(array.shape).encode())
+    digest.update(memoryview(array).cast("B"))
+
+def fingerprint(array, *options):
+    """
+    A content hash of array (dtype, shape and values) and any
+    extra options, for keying caches by data rather than identity.
+    Options which are arrays are hashed by content too.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    _update_digest(digest, array)
+    for option in options:
+        if isinstance(option, np.ndarray):
+            _update_digest(digest, option)
+        else:
+            digest.update(repr(option).encode())
+    return digest.hexdigest()
+
+class LRUCache:
+    """
+    A dict-like cache which evicts the least recently used entry
+    once it holds more than maxsize entries, or, if max_bytes is set,
+    once the entries' nbytes (given to put) add up to more than that.
+    """
+    def __init__(self, maxsize=128, max_bytes=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+        self.misses += 1
+        return default
+
+    def put(self, key, value, nbytes=0):
+        if key in self._entries:
+            self.nbytes -= self._entries[key][1]
+        self._entries[key] = (value, nbytes)
+        self._entries.move_to_end(key)
+        self.nbytes += nbytes
+        while len(self._entries) > self.maxsize or (
+                self.max_bytes is not None and self.nbytes > self.max_bytes
+                and len(self._entries) > 1):
+            _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+            self.nbytes -= evicted_nbytes
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+def _content(data):
+    """
+    The arrays which identify data: the values and counts of a
+    FrequencyTable (or anything with those), else the array itself.
+    """
+    if hasattr(data, "values") and hasattr(data, "counts"):
+        return [data.values, data.counts]
+    return [np.asarray(data)]
+
+def _nbytes(value):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    return sum(
+        getattr(value, name).nbytes
+        for name in ("values", "counts", "xs", "ps")
+        if isinstance(getattr(value, name, None), np.ndarray)
+    ) or 64
+
+_MISSING = object()
+
+class SummaryCache:
+    """
+    Memoizes what is computed per distribution (ECDFs, spreads,
+    inlier masks), keyed by a fingerprint of the data and the options,
+    so the same group and column is summarised once however many
+    times, or by however many matchers, it is compared.
+
+    @maxsize - most entries kept
+    @max_bytes - most bytes of arrays kept, None for no limit
+
+    hits and misses count lookups per kind of summary.
+    """
+    def __init__(self, maxsize=4096, max_bytes=2**28):
+        self.cache = LRUCache(maxsize=maxsize, max_bytes=max_bytes)
+        self.hits = {}
+        self.misses = {}
+
+    def __len__(self):
+        return len(self.cache)
+
+    def get_or_compute(self, kind, data, options, compute):
+        """
+        The cached summary of this kind for data and options,
+        or compute() which is then cached.
+        """
+        key = (kind, fingerprint(*_content(data), *options))
+        value = self.cache.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses[kind] = self.misses.get(kind, 0) + 1
+            value = compute()
+            self.cache.put(key, value, nbytes=_nbytes(value))
+        else:
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+        return value
+
+    def clear(self):
+        self.cache.clear()
+        self.hits.clear()
+        self.misses.clear()
+
+# shared by every matcher which is passed cache=True
+SUMMARY_CACHE = SummaryCache()
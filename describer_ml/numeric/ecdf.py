@@ -0,0 +1,117 @@
+import numpy as np
+
+class ECDF:
+    """
+    Empirical cumulative distribution function backed by sorted arrays.
+
+    @xs - the distinct values of the distribution, sorted
+    @ps - the fraction of the distribution which is <= each value
+    @count - the number of values the distribution was built from
+    """
+    def __init__(self, xs, ps, count=None):
+        self.xs = np.asarray(xs, dtype=float)
+        self.ps = np.asarray(ps, dtype=float)
+        self.count = len(self.xs) if count is None else count
+
+    @classmethod
+    def from_array(cls, dist):
+        values = np.asarray(dist, dtype=float).ravel()
+        xs, counts = np.unique(values, return_counts=True)
+        return cls(xs, np.cumsum(counts) / len(values), len(values))
+
+    @classmethod
+    def from_frequency_table(cls, table):
+        return cls(table.values, np.cumsum(table.counts) / table.count, table.count)
+
+    @classmethod
+    def from_dict(cls, cdf):
+        return cls(list(cdf.keys()), list(cdf.values()))
+
+    def to_dict(self):
+        return dict(zip(self.xs.tolist(), self.ps.tolist()))
+
+    def __len__(self):
+        return len(self.xs)
+
+    def compare_indices(self, values, max_deviance, distance_function=None):
+        """
+        For every value, the index of the value in this ECDF to compare
+        it against, or -1 if none is close enough.
+
+        Mirrors num_stats.get_compare_value: an exact match wins,
+        otherwise the smallest value which is np.isclose to it or within
+        max_deviance of it.
+
+        With the default (euclidean) distance this is a handful of
+        searchsorted calls.  A custom distance_function can't be searched
+        this way, so it falls back to scanning the values.
+        """
+        values = np.asarray(values, dtype=float)
+        if distance_function is not None:
+            return self._scan_compare_indices(values, max_deviance, distance_function)
+        xs = self.xs
+        last = len(xs) - 1
+        result = np.full(len(values), -1)
+        if last < 0:
+            return result
+
+        # np.isclose(a, b) means |a - b| <= atol + rtol * |b|
+        rtol, atol = 1e-05, 1e-08
+        tolerance = (atol + rtol * np.abs(values)) / (1 - rtol)
+        close_index = np.searchsorted(xs, values - tolerance, side="left")
+        # the bounds are loose by a rounding error, so look one value further
+        for candidate in (close_index + 1, close_index):
+            candidate = np.minimum(candidate, last)
+            close = np.abs(values - xs[candidate]) <= atol + rtol * np.abs(xs[candidate])
+            result = np.where(close, candidate, result)
+
+        near_index = np.searchsorted(xs, values - max_deviance, side="left")
+        for candidate in (near_index + 1, near_index):
+            candidate = np.minimum(candidate, last)
+            near = np.abs(values - xs[candidate]) < max_deviance
+            result = np.where(
+                near & ((result == -1) | (candidate < result)),
+                candidate, result
+            )
+
+        exact_index = np.minimum(
+            np.searchsorted(xs, values, side="left"), last
+        )
+        exact = xs[exact_index] == values
+        return np.where(exact, exact_index, result)
+
+    def _scan_compare_indices(self, values, max_deviance, distance_function):
+        result = np.full(len(values), -1)
+        exact_index = np.searchsorted(self.xs, values, side="left")
+        for position, value in enumerate(values):
+            if exact_index[position] < len(self.xs) and \
+               self.xs[exact_index[position]] == value:
+                result[position] = exact_index[position]
+                continue
+            for index, value_two in enumerate(self.xs):
+                if (np.isclose(value, value_two) or
+                        distance_function(value, value_two) < max_deviance):
+                    result[position] = index
+                    break
+        return result
+
+    def within_boundary(self, other, spread, max_deviance,
+                        distance_function=None):
+        """
+        For every value of this ECDF, whether the other ECDF has a close
+        enough value (see compare_indices) whose cumulative probability
+        is strictly within spread of this one.
+        """
+        indices = other.compare_indices(
+            self.xs, max_deviance,
+            distance_function=distance_function
+        )
+        found = indices != -1
+        if not found.any():
+            return found
+        other_ps = other.ps[np.where(found, indices, 0)]
+        return (
+            found &
+            (other_ps < self.ps + spread) &
+            (other_ps > self.ps - spread)
+        )
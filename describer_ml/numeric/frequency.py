@@ -0,0 +1,263 @@
+from collections import namedtuple
+import numpy as np
+from describer_ml._lazy import lazy_import
+
+stats = lazy_import("scipy.stats")
+special = lazy_import("scipy.special")
+
+RepeatedResults = namedtuple("RepeatedResults", "values counts")
+
+class FrequencyTable:
+    """
+    A distribution stored as its distinct values and how often each one
+    occurs, for low-cardinality data (codes, rounded prices, counts).
+
+    Every statistic is computed from the table directly, so memory and
+    time scale with the number of distinct values rather than rows, and
+    matches the num_stats function on the expanded array.  That
+    includes entropy, of the values as probabilities; the entropy of
+    how the values are distributed is distribution_entropy.
+    num_stats functions accept a FrequencyTable in place of an array.
+
+    @values - the values, duplicates are combined
+    @counts - how often each value occurs; non-integer weights are
+    allowed, quantiles then interpolate on the cumulative weight
+    """
+    def __init__(self, values, counts=None):
+        values = np.asarray(values, dtype=float).ravel()
+        if counts is None:
+            counts = np.ones(len(values))
+        counts = np.asarray(counts, dtype=float).ravel()
+        if len(values) != len(counts):
+            raise ValueError("values and counts must be the same length")
+        if np.any(counts < 0):
+            raise ValueError("counts must not be negative")
+        values, inverse = np.unique(values, return_inverse=True)
+        counts = np.bincount(inverse.ravel(), weights=counts, minlength=len(values))
+        nonzero = counts > 0
+        self.values = values[nonzero]
+        self.counts = counts[nonzero]
+
+    @classmethod
+    def from_array(cls, array):
+        values, counts = np.unique(np.asarray(array, dtype=float), return_counts=True)
+        return cls(values, counts)
+
+    @classmethod
+    def from_value_counts(cls, value_counts):
+        """
+        From a pandas Series like the one Series.value_counts returns.
+        """
+        return cls(value_counts.index.to_numpy(), value_counts.to_numpy())
+
+    @property
+    def count(self):
+        return self.counts.sum()
+
+    def __len__(self):
+        return int(round(self.count))
+
+    def __repr__(self):
+        return "FrequencyTable({} distinct values, count={})".format(
+            len(self.values), self.count
+        )
+
+    def merge(self, other):
+        return FrequencyTable(
+            np.concatenate([self.values, other.values]),
+            np.concatenate([self.counts, other.counts])
+        )
+
+    def update(self, array):
+        return self.merge(FrequencyTable.from_array(array))
+
+    def to_array(self):
+        return np.repeat(self.values, self.counts.astype(int))
+
+    def select(self, mask):
+        """
+        The table restricted to the values where mask is True.
+        """
+        return FrequencyTable(self.values[mask], self.counts[mask])
+
+    @property
+    def has_nan(self):
+        return len(self.values) > 0 and np.isnan(self.values[-1])
+
+    def dropna(self):
+        return self.select(~np.isnan(self.values))
+
+    # order statistics
+
+    def minimum(self):
+        return np.nan if self.has_nan else self.values[0]
+
+    def maximum(self):
+        return np.nan if self.has_nan else self.values[-1]
+
+    def value_range(self):
+        return abs(self.maximum() - self.minimum())
+
+    def _value_at_rank(self, rank):
+        cumulative = np.cumsum(self.counts)
+        index = np.searchsorted(cumulative, rank, side="right")
+        return self.values[np.minimum(index, len(self.values) - 1)]
+
+    def quantile(self, q):
+        """
+        Same as np.quantile with the default linear interpolation.
+        """
+        q = np.asarray(q, dtype=float)
+        if self.has_nan or len(self.values) == 0:
+            return np.full(q.shape, np.nan)[()]
+        position = q * (self.count - 1)
+        lower = np.floor(position)
+        lower_value = self._value_at_rank(lower)
+        upper_value = self._value_at_rank(lower + 1)
+        return (lower_value + (upper_value - lower_value) * (position - lower))[()]
+
+    def percentile(self, q):
+        return self.quantile(np.asarray(q) / 100)
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def interquartile_range(self):
+        q1, q3 = self.quantile([0.25, 0.75])
+        return q3 - q1
+
+    def trimean(self):
+        q1, median, q3 = self.quantile([0.25, 0.5, 0.75])
+        return (q1 + 2*median + q3)/4
+
+    def midhinge(self):
+        q1, q3 = self.quantile([0.25, 0.75])
+        return (q1 + q3)/2
+
+    def interquartile_mean(self):
+        q1, q3 = self.quantile([0.25, 0.75])
+        in_range = (self.values >= q1) & (self.values <= q3)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (
+                np.sum(self.values[in_range] * self.counts[in_range]) /
+                np.sum(self.counts[in_range])
+            )
+
+    def _trim_ranks(self, limits):
+        lower, upper = (limits, limits) if np.ndim(limits) == 0 else limits
+        low = int(lower * self.count)
+        high = self.count - int(upper * self.count)
+        if low >= high:
+            raise ValueError("Proportion too big.")
+        return low, high
+
+    def trimmed_mean(self, proportiontocut=0.1):
+        # nothing left to trim, like an empty mean
+        if self.has_nan or self.count == 0:
+            return np.nan
+        low, high = self._trim_ranks(proportiontocut)
+        cumulative = np.cumsum(self.counts)
+        kept = np.clip(
+            np.minimum(cumulative, high) - np.maximum(cumulative - self.counts, low),
+            0, None
+        )
+        return np.sum(self.values * kept) / np.sum(kept)
+
+    def _winsorized(self, limits):
+        low, high = self._trim_ranks(limits)
+        return FrequencyTable(
+            np.clip(self.values, self._value_at_rank(low), self._value_at_rank(high - 1)),
+            self.counts
+        )
+
+    def winsorized_mean(self, limits=0.1):
+        if self.has_nan or self.count == 0:
+            return np.nan
+        return self._winsorized(limits).mean()
+
+    def winsorized_variance(self, limits=0.1):
+        if self.has_nan or self.count == 0:
+            return np.nan
+        return self._winsorized(limits).variance()
+
+    def mode(self):
+        return self.values[np.argmax(self.counts)]
+
+    def find_repeats(self):
+        repeated = self.counts > 1
+        return RepeatedResults(self.values[repeated], self.counts[repeated])
+
+    # moments
+
+    def _weighted_mean(self, values):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.sum(values * self.counts) / self.count
+
+    def mean(self):
+        return self._weighted_mean(self.values)
+
+    def _central_moment(self, order):
+        return self._weighted_mean((self.values - self.mean())**order)
+
+    def variance(self):
+        return self._central_moment(2)
+
+    def standard_deviation(self):
+        return np.sqrt(self.variance())
+
+    def skew(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self._central_moment(3) / self.variance()**1.5
+
+    def kurtosis(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self._central_moment(4) / self.variance()**2 - 3
+
+    def variation(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.standard_deviation() / self.mean()
+
+    def geometric_mean(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.exp(self._weighted_mean(np.log(self.values)))
+
+    def harmonic_mean(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return 1 / self._weighted_mean(1 / self.values)
+
+    def _absolute_deviation(self, center):
+        return self._weighted_mean(np.abs(self.values - center))
+
+    def mean_absolute_deviation(self):
+        return self._absolute_deviation(self.mean())
+
+    def median_absolute_deviation(self):
+        return self._absolute_deviation(self.median())
+
+    def trimean_absolute_deviation(self):
+        return self._absolute_deviation(self.trimean())
+
+    def entropy(self):
+        """
+        num_stats.entropy of the expanded array, which treats the
+        values themselves as (unnormalised) probabilities.  For the
+        entropy of the distribution of the values see
+        distribution_entropy.
+        """
+        probabilities = self.values / np.sum(self.values * self.counts)
+        return np.sum(self.counts * special.entr(probabilities))
+
+    def distribution_entropy(self, other=None):
+        """
+        The entropy of the distribution the table describes, how often
+        each value occurs, or the relative entropy (KL divergence) to
+        another FrequencyTable.
+        """
+        if other is None:
+            return stats.entropy(self.counts)
+        values = np.union1d(self.values, other.values)
+        counts = np.zeros(len(values))
+        other_counts = np.zeros(len(values))
+        counts[np.searchsorted(values, self.values)] = self.counts
+        other_counts[np.searchsorted(values, other.values)] = other.counts
+        return stats.entropy(counts, other_counts)
@@ -1,145 +1,529 @@
-import pandas as pd
+from collections import namedtuple
 import numpy as np
-from thinkbayes2 import Cdf as CDF
-from scipy import stats
-from scipy.spatial import distance
-from sklearn.ensemble import IsolationForest
-from sklearn import preprocessing 
-
-def minimum(array):
-    return np.amin(array)
-
-def maximum(array):
-    return np.amax(array)
-
-def minimum_with_nan(array):
-    return np.nanmin(array)
-
-def maximum_with_nan(array):
-    return np.nanmax(array)
-
-def percentile(array):
-    return np.percentile(array)
-
-def percentile_with_nan(array):
-    return np.nanpercentile(array)
-
-def quantile(array, q):
-    return np.quantile(array, q)
-
-def quantile_with_nan(array, q):
-    return np.nanquantile(array, q)
-
-def median(array):
-    return np.median(array)
-
-def mean(array):
-    return np.mean(array)
-
-def standard_deviation(array):
-    return np.std(array)
+from describer_ml._lazy import lazy_import
+from describer_ml.numeric.sketch import QuantileSketch
+from describer_ml.numeric.frequency import FrequencyTable
+from describer_ml.numeric.ecdf import ECDF
+from describer_ml.numeric.outliers import get_outlier_filter
+from describer_ml.numeric.cache import SUMMARY_CACHE
+
+pd = lazy_import("pandas")
+stats = lazy_import("scipy.stats")
+distance = lazy_import("scipy.spatial.distance")
+
+def _label_axis(result, data, axis):
+    """
+    Results computed along an axis of a DataFrame come back as a
+    Series labelled by the other axis, like DataFrame.mean.
+    """
+    if np.ndim(data) == 2 and hasattr(data, "columns") and np.ndim(result) == 1:
+        if axis in (0, -2):
+            return pd.Series(result, index=data.columns)
+        if axis in (1, -1):
+            return pd.Series(result, index=data.index)
+    return result
+
+def _keepdims(result, axis):
+    if axis is None:
+        return result
+    return np.expand_dims(result, axis)
+
+def minimum(array, axis=None):
+    if isinstance(array, FrequencyTable):
+        return array.minimum()
+    return np.amin(array, axis=axis)
+
+def maximum(array, axis=None):
+    if isinstance(array, FrequencyTable):
+        return array.maximum()
+    return np.amax(array, axis=axis)
+
+def minimum_with_nan(array, axis=None):
+    if isinstance(array, FrequencyTable):
+        return array.dropna().minimum()
+    return np.nanmin(array, axis=axis)
+
+def maximum_with_nan(array, axis=None):
+    if isinstance(array, FrequencyTable):
+        return array.dropna().maximum()
+    return np.nanmax(array, axis=axis)
+
+def percentile(array, q, axis=None):
+    if isinstance(array, FrequencyTable):
+        return array.percentile(q)
+    return _label_axis(np.percentile(array, q, axis=axis), array, axis)
+
+def percentile_with_nan(array, q, axis=None):
+    if isinstance(array, FrequencyTable):
+        return array.dropna().percentile(q)
+    return _label_axis(np.nanpercentile(array, q, axis=axis), array, axis)
+
+def quantile(array, q, axis=None):
+    if isinstance(array, (QuantileSketch, FrequencyTable)):
+        return array.quantile(q)
+    return _label_axis(np.quantile(array, q, axis=axis), array, axis)
+
+def quantile_with_nan(array, q, axis=None):
+    if isinstance(array, FrequencyTable):
+        return array.dropna().quantile(q)
+    if isinstance(array, QuantileSketch):
+        return array.quantile(q)
+    return _label_axis(np.nanquantile(array, q, axis=axis), array, axis)
+
+def median(array, axis=None):
+    if isinstance(array, (QuantileSketch, FrequencyTable)):
+        return array.median()
+    return _label_axis(np.median(array, axis=axis), array, axis)
+
+def mean(array, axis=None):
+    if isinstance(array, FrequencyTable):
+        return array.mean()
+    return np.mean(array, axis=axis)
+
+def standard_deviation(array, axis=None):
+    if isinstance(array, FrequencyTable):
+        return array.standard_deviation()
+    return np.std(array, axis=axis)
+
+def variance(array, axis=None):
+    if isinstance(array, FrequencyTable):
+        return array.variance()
+    return np.var(array, axis=axis)
+
+def median_with_nan(array, axis=None):
+    if isinstance(array, FrequencyTable):
+        return array.dropna().median()
+    if isinstance(array, QuantileSketch):
+        return array.median()
+    return _label_axis(np.nanmedian(array, axis=axis), array, axis)
+
+def mean_with_nan(array, axis=None):
+    if isinstance(array, FrequencyTable):
+        return array.dropna().mean()
+    return np.nanmean(array, axis=axis)
+
+def standard_deviation_with_nan(array, axis=None):
+    if isinstance(array, FrequencyTable):
+        return array.dropna().standard_deviation()
+    return np.nanstd(array, axis=axis)
+
+def variance_with_nan(array, axis=None):
+    if isinstance(array, FrequencyTable):
+        return array.dropna().variance()
+    return np.nanvar(array, axis=axis)
+
+# the scipy.stats based functions keep scipy's default of axis=0
+
+def geometric_mean(array, axis=0):
+    if isinstance(array, FrequencyTable):
+        return array.geometric_mean()
+    return _label_axis(stats.gmean(array, axis=axis), array, axis)
+
+def harmonic_mean(array, axis=0):
+    if isinstance(array, FrequencyTable):
+        return array.harmonic_mean()
+    return _label_axis(stats.hmean(array, axis=axis), array, axis)
+
+def kurtosis(array, axis=0):
+    if isinstance(array, FrequencyTable):
+        return array.kurtosis()
+    return _label_axis(stats.kurtosis(array, axis=axis), array, axis)
+
+def mode(array, axis=0):
+    if isinstance(array, FrequencyTable):
+        return array.mode()
+    result = np.squeeze(stats.mode(array, axis=axis).mode)[()]
+    return _label_axis(result, array, axis)
+
+def skew(array, axis=0):
+    if isinstance(array, FrequencyTable):
+        return array.skew()
+    return _label_axis(stats.skew(array, axis=axis), array, axis)
+
+def variation(array, axis=0):
+    if isinstance(array, FrequencyTable):
+        return array.variation()
+    return _label_axis(stats.variation(array, axis=axis), array, axis)
 
-def variance(array):
-    return np.var(array)
+def find_repeats(array):
+    if isinstance(array, FrequencyTable):
+        return array.find_repeats()
+    # scipy.stats.find_repeats is deprecated, a table gives the same
+    return FrequencyTable.from_array(array).find_repeats()
+
+def interquartile_range(array, axis=0):
+    if isinstance(array, (QuantileSketch, FrequencyTable)):
+        return array.interquartile_range()
+    return _label_axis(stats.iqr(array, axis=axis), array, axis)
+
+def entropy(probabilities, alternative_probabilities=None, axis=0):
+    if isinstance(probabilities, FrequencyTable):
+        if alternative_probabilities is not None:
+            # pairing the values needs the arrays, see
+            # FrequencyTable.distribution_entropy for tables
+            raise ValueError(
+                "Relative entropy of a FrequencyTable is not defined "
+                "elementwise, use FrequencyTable.distribution_entropy"
+            )
+        return probabilities.entropy()
+    return _label_axis(
+        stats.entropy(probabilities, alternative_probabilities, axis=axis),
+        probabilities, axis
+    )
 
-def median_with_nan(array):
-    return np.nanmedian(array)
+def l_estimator(data, quantiles, weights, axis=None):
+    """
+    An L-estimator, a weighted sum of quantiles:
+    sum(weights[i] * quantile(data, quantiles[i]))
 
-def mean_with_nan(array):
-    return np.nanmean(array)
+    All the quantiles come from one np.quantile call, which selects
+    them with np.partition rather than sorting the data.
+    e.g. trimean is l_estimator(data, [0.25, 0.5, 0.75], [0.25, 0.5, 0.25])
+    """
+    if isinstance(data, (QuantileSketch, FrequencyTable)):
+        return np.dot(weights, data.quantile(quantiles))
+    values = np.quantile(data, quantiles, axis=axis)
+    return _label_axis(np.tensordot(weights, values, axes=1)[()], data, axis)
+
+def trimean(data, axis=None):
+    if isinstance(data, (QuantileSketch, FrequencyTable)):
+        return data.trimean()
+    return l_estimator(data, [0.25, 0.5, 0.75], [0.25, 0.5, 0.25], axis=axis)
+
+def _mean_between_quantiles(data, quantile_function, axis):
+    values = np.asarray(data, dtype=float)
+    q1, q3 = quantile_function(values, [0.25, 0.75], axis=axis, keepdims=True)
+    # nan is never in range, so this also serves the nan variant
+    in_range = (values >= q1) & (values <= q3)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = (
+            np.sum(values, axis=axis, where=in_range) /
+            np.sum(in_range, axis=axis)
+        )
+    return _label_axis(result, data, axis)
+
+def interquartile_mean(data, axis=None):
+    if isinstance(data, (QuantileSketch, FrequencyTable)):
+        return data.interquartile_mean()
+    return _mean_between_quantiles(data, np.quantile, axis)
+
+def interquartile_mean_with_nan(data, axis=None):
+    if isinstance(data, FrequencyTable):
+        return data.dropna().interquartile_mean()
+    if isinstance(data, QuantileSketch):
+        return data.interquartile_mean()
+    return _mean_between_quantiles(data, np.nanquantile, axis)
+
+def midhinge(data, axis=None):
+    if isinstance(data, (QuantileSketch, FrequencyTable)):
+        return data.midhinge()
+    return l_estimator(data, [0.25, 0.75], [0.5, 0.5], axis=axis)
+
+def value_range(data, axis=None):
+    if isinstance(data, FrequencyTable):
+        return data.value_range()
+    max_val = np.max(data, axis=axis)
+    min_val = np.min(data, axis=axis)
+    return abs(max_val - min_val)
 
-def standard_deviation_with_nan(array):
-    return np.nanstd(array)
+def _absolute_deviation(data, center, axis):
+    values = np.asarray(data, dtype=float)
+    result = np.mean(np.abs(values - _keepdims(center, axis)), axis=axis)
+    return _label_axis(result, data, axis)
 
-def variance_with_nan(array):
-    return np.nanvar(array)
+def trimean_absolute_deviation(data, axis=None):
+    if isinstance(data, FrequencyTable):
+        return data.trimean_absolute_deviation()
+    return _absolute_deviation(
+        data, np.asarray(trimean(data, axis=axis)), axis
+    )
 
-def geometric_mean(array):
-    return stats.gmean(array)
+def mean_absolute_deviation(data, axis=None):
+    if isinstance(data, FrequencyTable):
+        return data.mean_absolute_deviation()
+    return _absolute_deviation(
+        data, np.mean(np.asarray(data, dtype=float), axis=axis), axis
+    )
 
-def harmonic_mean(array):
-    return stats.hmean(array)
+def median_absolute_deviation(data, axis=None):
+    if isinstance(data, FrequencyTable):
+        return data.median_absolute_deviation()
+    return _absolute_deviation(
+        data, np.median(np.asarray(data, dtype=float), axis=axis), axis
+    )
 
-def kurtosis(array):
-    return stats.kurtosis(array)
+def _trim_limits(limits):
+    if np.ndim(limits) == 0:
+        return limits, limits
+    return tuple(limits)
 
-def mode(array):
-    return stats.mode(array).mode[0]
+def _trim_ranks(length, limits):
+    """
+    The ranks [low, high) which remain after cutting limits[0] of the
+    values from the bottom and limits[1] from the top,
+    following scipy.stats.trim_mean and mstats.winsorize.
+    """
+    lower, upper = _trim_limits(limits)
+    low = int(lower * length)
+    high = length - int(upper * length)
+    if low >= high:
+        raise ValueError("Proportion too big.")
+    return low, high
+
+def _select(values, low, high, axis):
+    """
+    Partitions values so the ranks low and high - 1 are in place and
+    everything between them lies between them; O(n), no sort.
+    """
+    return np.partition(values, sorted({low, high - 1}), axis=axis)
+
+def _trimmed_mean(values, limits, axis):
+    low, high = _trim_ranks(values.shape[axis], limits)
+    partitioned = _select(values, low, high, axis)
+    return np.mean(np.take(partitioned, np.arange(low, high), axis=axis), axis=axis)
+
+def _winsorize(values, limits, axis):
+    low, high = _trim_ranks(values.shape[axis], limits)
+    partitioned = _select(values, low, high, axis)
+    return np.clip(
+        values,
+        np.take(partitioned, [low], axis=axis),
+        np.take(partitioned, [high - 1], axis=axis)
+    )
 
-def skew(array):
-    return stats.skew(array)
+def _winsorized_mean(values, limits, axis):
+    return np.mean(_winsorize(values, limits, axis), axis=axis)
+
+def _winsorized_variance(values, limits, axis):
+    return np.var(_winsorize(values, limits, axis), axis=axis)
+
+def _trimmed_slice(function, vector, limits):
+    if len(vector) == 0:
+        return np.nan
+    return function(vector, limits, 0)
+
+def _apply_trimmed(function, data, limits, axis, ignore_nan):
+    values = np.asarray(data, dtype=float)
+    if axis is None:
+        values, axis = values.ravel(), 0
+    if ignore_nan:
+        # slices keep different numbers of values, so go one at a time;
+        # one with none left has nothing to trim, like an empty mean
+        result = np.apply_along_axis(
+            lambda vector: _trimmed_slice(function, vector[~np.isnan(vector)], limits),
+            axis, values
+        )
+    elif values.shape[axis] == 0:
+        result = np.full(np.delete(values.shape, axis), np.nan)
+    else:
+        result = function(values, limits, axis)
+        result = np.where(np.isnan(values).any(axis=axis), np.nan, result)
+    return _label_axis(result[()], data, axis)
 
-def variation(array):
-    return stats.variation(array)
+def trimmed_mean(data, proportiontocut=0.1, axis=None):
+    """
+    Mean of data with proportiontocut of the values cut from each end,
+    or (lower, upper) proportions to cut from the bottom and top.
+    Same as scipy.stats.trim_mean, found by selection rather than sorting.
+    """
+    if isinstance(data, FrequencyTable):
+        return data.trimmed_mean(proportiontocut)
+    return _apply_trimmed(_trimmed_mean, data, proportiontocut, axis, False)
 
-def find_repeats(array):
-    return stats.find_repeats(array)
-
-def interquartile_range(array):
-    return stats.iqr(array)
-
-def entropy(probabilities, alternative_probabilities=None):
-    return stats.entropy(probabilities, alternative_probabilities)
-
-def trimean(data):
-    q1 = np.quantile(data, 0.25)
-    q3 = np.quantile(data, 0.75)
-    median = np.median(data)
-    return (q1 + 2*median + q3)/4
-
-def interquartile_mean(data):
-    q1 = np.quantile(data, 0.25)
-    q3 = np.quantile(data, 0.75)
-    sorted_data = np.sort(data)
-    trimmed_data = sorted_data[(sorted_data >= q1) & (sorted_data <= q3)]
-    return np.mean(trimmed_data)
-
-def midhinge(data):
-    q1 = np.quantile(data, 0.25)
-    q3 = np.quantile(data, 0.75)
-    return np.mean([q1, q3])
-
-def value_range(data):
-    max_val = np.max(data)
-    min_val = np.min(data)
-    return abs(max_val - min_val)
+def trimmed_mean_with_nan(data, proportiontocut=0.1, axis=None):
+    if isinstance(data, FrequencyTable):
+        return data.dropna().trimmed_mean(proportiontocut)
+    return _apply_trimmed(_trimmed_mean, data, proportiontocut, axis, True)
 
-def trimean_absolute_deviation(data):
-    _trimean = trimean(data)
-    numerator = [abs(elem - _trimean) for elem in data]
-    return sum(numerator)/len(data)
+def winsorized_mean(data, limits=0.1, axis=None):
+    """
+    Mean of data after the limits proportion of values at each end,
+    or (lower, upper) proportions, are replaced with the nearest
+    remaining value, as in scipy.stats.mstats.winsorize.
+    """
+    if isinstance(data, FrequencyTable):
+        return data.winsorized_mean(limits)
+    return _apply_trimmed(_winsorized_mean, data, limits, axis, False)
 
-def mean_absolute_deviation(data):
-    _mean = mean(data)
-    numerator = [abs(elem - _mean) for elem in data]
-    return sum(numerator)/len(data)
+def winsorized_mean_with_nan(data, limits=0.1, axis=None):
+    if isinstance(data, FrequencyTable):
+        return data.dropna().winsorized_mean(limits)
+    return _apply_trimmed(_winsorized_mean, data, limits, axis, True)
 
-def median_absolute_deviation(data):
-    _median = median(data)
-    numerator = [abs(elem - _median) for elem in data]
-    return sum(numerator)/len(data)
+def winsorized_variance(data, limits=0.1, axis=None):
+    """
+    Variance of the winsorized data, see winsorized_mean.
+    """
+    if isinstance(data, FrequencyTable):
+        return data.winsorized_variance(limits)
+    return _apply_trimmed(_winsorized_variance, data, limits, axis, False)
+
+def winsorized_variance_with_nan(data, limits=0.1, axis=None):
+    if isinstance(data, FrequencyTable):
+        return data.dropna().winsorized_variance(limits)
+    return _apply_trimmed(_winsorized_variance, data, limits, axis, True)
+
+DESCRIBE_STATS = [
+    "minimum", "maximum", "value_range",
+    "median", "interquartile_range", "trimean",
+    "midhinge", "interquartile_mean",
+    "mean", "variance", "standard_deviation",
+    "skew", "kurtosis", "variation",
+    "mean_absolute_deviation", "median_absolute_deviation",
+    "trimean_absolute_deviation"
+]
+
+Description = namedtuple("Description", DESCRIBE_STATS)
+# namedtuple's defaults= needs Python 3.7
+Description.__new__.__defaults__ = (None,) * len(DESCRIBE_STATS)
+
+_ORDER_STATS = {
+    "minimum", "maximum", "value_range",
+    "median", "interquartile_range", "trimean",
+    "midhinge", "interquartile_mean",
+    "median_absolute_deviation", "trimean_absolute_deviation"
+}
+
+_MOMENT_STATS = {
+    "mean", "variance", "standard_deviation",
+    "skew", "kurtosis", "variation",
+    "mean_absolute_deviation"
+}
+
+def _quantile_positions(length, quantiles):
+    positions = []
+    for q in quantiles:
+        position = q * (length - 1)
+        lower = int(np.floor(position))
+        positions.append((lower, min(lower + 1, length - 1), position - lower))
+    return positions
+
+def _partitioned_quantile(partitioned, position):
+    lower, upper, fraction = position
+    return partitioned[lower] + (partitioned[upper] - partitioned[lower]) * fraction
+
+def describe(array, stats=None):
+    """
+    Computes several descriptive statistics of a 1-D array together.
+
+    Rather than calling trimean, midhinge, variance, etc one at a time,
+    which re-sorts or re-quantiles the data on every call, the requested
+    statistics are planned together:
+    * every order statistic (quantiles, minimum, maximum) comes from a
+    single np.partition of the data
+    * every moment comes from a single pass over the mean-centered data
+
+    @array - the data, or a FrequencyTable
+    @stats - a list of statistic names, see DESCRIBE_STATS.
+    If None, every statistic is computed.
+
+    Returns a Description namedtuple, statistics which were not
+    requested are None.  Values match the individual functions in this
+    module, e.g. describe(x).trimean == trimean(x).
+    """
+    if stats is None:
+        stats = DESCRIBE_STATS
+    unknown = set(stats) - set(DESCRIBE_STATS)
+    if unknown:
+        raise ValueError(
+            "Unknown statistics: {}".format(sorted(unknown))
+        )
+    stats = set(stats)
+    if isinstance(array, FrequencyTable):
+        return Description(**{
+            stat: getattr(array, stat)() for stat in stats
+        })
+    data = np.asarray(array, dtype=float).ravel()
+    length = len(data)
+    if length == 0:
+        raise ValueError("describe requires a non-empty array")
+    result = {}
+
+    if stats & _ORDER_STATS:
+        positions = _quantile_positions(length, [0.25, 0.5, 0.75])
+        kth = sorted({0, length - 1} | {
+            index for position in positions for index in position[:2]
+        })
+        partitioned = np.partition(data, kth)
+        if np.isnan(partitioned[-1]):
+            # np.partition moves nan to the end, mirror np.quantile
+            q1 = q2 = q3 = _min = _max = np.nan
+        else:
+            q1, q2, q3 = [
+                _partitioned_quantile(partitioned, position)
+                for position in positions
+            ]
+            _min, _max = partitioned[0], partitioned[-1]
+        _trimean = (q1 + 2*q2 + q3)/4
+        result["minimum"] = _min
+        result["maximum"] = _max
+        result["value_range"] = abs(_max - _min)
+        result["median"] = q2
+        result["interquartile_range"] = q3 - q1
+        result["trimean"] = _trimean
+        result["midhinge"] = (q1 + q3)/2
+        if "interquartile_mean" in stats:
+            result["interquartile_mean"] = np.mean(
+                data[(data >= q1) & (data <= q3)]
+            )
+        if "median_absolute_deviation" in stats:
+            result["median_absolute_deviation"] = np.mean(np.abs(data - q2))
+        if "trimean_absolute_deviation" in stats:
+            result["trimean_absolute_deviation"] = np.mean(np.abs(data - _trimean))
+
+    if stats & _MOMENT_STATS:
+        _mean = np.mean(data)
+        deviations = data - _mean
+        squared_deviations = deviations * deviations
+        second_moment = np.mean(squared_deviations)
+        result["mean"] = _mean
+        result["variance"] = second_moment
+        result["standard_deviation"] = np.sqrt(second_moment)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if "skew" in stats:
+                third_moment = np.mean(squared_deviations * deviations)
+                result["skew"] = third_moment / second_moment**1.5
+            if "kurtosis" in stats:
+                fourth_moment = np.mean(squared_deviations * squared_deviations)
+                result["kurtosis"] = fourth_moment / second_moment**2 - 3
+            result["variation"] = np.sqrt(second_moment) / _mean
+        if "mean_absolute_deviation" in stats:
+            result["mean_absolute_deviation"] = np.mean(np.abs(deviations))
+
+    return Description(**{
+        stat: value for stat, value in result.items()
+        if stat in stats
+    })
+
+def describe_with_nan(array, stats=None):
+    """
+    Same as describe, ignoring nan values.
+    """
+    if isinstance(array, FrequencyTable):
+        return describe(array.dropna(), stats=stats)
+    data = np.asarray(array, dtype=float).ravel()
+    return describe(data[~np.isnan(data)], stats=stats)
 
 def _get_cdf(dist):
-    cdf = CDF(dist)
-    return dict(
-        zip(
-            list(cdf.xs),
-            list(cdf.ps)
-        )
-    )
+    return _to_ecdf(dist).to_dict()
 
 def _get_prob_values(cdf):
     return list(cdf.values())
 
-def get_inliers_outliers(dist):
-    clf = IsolationForest(
-        behaviour='new', contamination='auto'
-    )
-    result = clf.fit_predict(dist.reshape(-1, 1))
-    result = pd.Series(result)
-    outliers = dist[result[result == -1].index]
-    inliers = dist[result[result != -1].index]
-    return inliers, outliers
+def get_inliers_outliers(dist, method="isolation_forest"):
+    """
+    Splits dist into inliers and outliers.
+
+    @method - "isolation_forest", "mad" (modified z-score) or "iqr"
+    (Tukey's fences), or an outlier filter object,
+    see describer_ml.numeric.outliers
+    """
+    if not isinstance(dist, FrequencyTable):
+        dist = np.asarray(dist)
+    inlier_mask = get_outlier_filter(method).inlier_mask(dist)
+    if isinstance(dist, FrequencyTable):
+        return dist.select(inlier_mask), dist.select(~inlier_mask)
+    return dist[inlier_mask], dist[~inlier_mask]
     
 def isclose(value_one, value_two,
             max_deviance,
@@ -194,125 +578,220 @@ def get_within_boundary(cdf_one, cdf_two, spread,
                         distance_function=None):
     """
     Please see doc string in isclose. 
+
+    cdf_one and cdf_two are ECDFs, or dicts as returned by _get_cdf.
     """
-    within_upper_bound = []
-    within_lower_bound = []
-    for value in cdf_one:
-        other_value = get_compare_value(
-            value, cdf_two, max_deviance,
-            distance_function=distance_function
-        )
-        if not other_value:
-            within_upper_bound.append(False)
-            within_lower_bound.append(False)
+    if not isinstance(cdf_one, ECDF):
+        cdf_one = ECDF.from_dict(cdf_one)
+    if not isinstance(cdf_two, ECDF):
+        cdf_two = ECDF.from_dict(cdf_two)
+    return cdf_one.within_boundary(
+        cdf_two, spread, max_deviance,
+        distance_function=distance_function
+    )
+
+def get_inliers(dist, method="isolation_forest"):
+    if not isinstance(dist, FrequencyTable):
+        dist = np.array(dist)
+    inliers, outliers = get_inliers_outliers(dist, method=method)
+    return inliers
+
+def _to_ecdf(dist):
+    if isinstance(dist, ECDF):
+        return dist
+    if isinstance(dist, FrequencyTable):
+        return ECDF.from_frequency_table(dist)
+    return ECDF.from_array(dist)
+
+_SPREAD_FUNCTIONS = {
+    "mean_absolute_deviation": mean_absolute_deviation,
+    "median_absolute_deviation": median_absolute_deviation,
+    "trimean_absolute_deviation": trimean_absolute_deviation
+}
+
+class ReferenceDistribution:
+    """
+    A reference distribution prepared once, for comparing many
+    candidate distributions against it.
+
+    compare_cdf_* rebuild the CDF of dist_one, its spread and its
+    inliers on every call.  Here that happens once, in the constructor,
+    and only the candidates are prepared per comparison.
+
+    @dist - the reference distribution, dist_one in compare_cdf_*,
+    an array or a FrequencyTable
+    @spread - how far apart the cumulative probabilities may be,
+    one of "mean_absolute_deviation", "median_absolute_deviation",
+    "trimean_absolute_deviation" (of the reference cumulative
+    probabilities) or "hard_coded_boundary" (boundary itself)
+    @outlier_method - see get_inliers_outliers
+    @cache - a cache.SummaryCache to memoize the ECDFs, inliers and
+    spread in, True for the shared cache.SUMMARY_CACHE or None not to.
+    Entries are keyed by content, so they are reused by every
+    ReferenceDistribution given the same data and options, whatever
+    its spread.
+
+    Please see doc string for isclose for max_deviance.
+    """
+    def __init__(self, dist, max_deviance,
+                 spread="mean_absolute_deviation",
+                 boundary=0.01,
+                 distance_function=None,
+                 remove_outliers=True,
+                 outlier_method="isolation_forest",
+                 cache=None):
+        if spread != "hard_coded_boundary" and spread not in _SPREAD_FUNCTIONS:
+            raise ValueError("Unknown spread: {}".format(spread))
+        self.max_deviance = max_deviance
+        self.distance_function = distance_function
+        self.remove_outliers = remove_outliers
+        self.outlier_method = outlier_method
+        self.cache = SUMMARY_CACHE if cache is True else cache
+        self.cdf = self._get_cdf(dist)
+        if spread == "hard_coded_boundary":
+            self.spread = boundary
         else:
-            within_upper_bound.append(
-                cdf_two[other_value] < cdf_one[value] + spread
-            )
-            within_lower_bound.append(
-                cdf_two[other_value] > cdf_one[value] - spread
+            self.spread = self._memoize(
+                "spread", self.cdf.ps, (spread,),
+                lambda: _SPREAD_FUNCTIONS[spread](self.cdf.ps)
             )
-    within_upper_bound = np.array(within_upper_bound)
-    within_lower_bound = np.array(within_lower_bound)
-    return within_upper_bound & within_lower_bound
 
-def get_inliers(dist):
-    dist = np.array(dist)
-    inliers, outliers = get_inliers_outliers_if(dist)
-    return inliers
+    def _memoize(self, kind, data, options, compute):
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(kind, data, options, compute)
+
+    def _get_inliers(self, dist):
+        return self._memoize(
+            "inliers", dist, (self.outlier_method,),
+            lambda: get_inliers(dist, method=self.outlier_method)
+        )
+
+    def _get_cdf(self, candidate):
+        if isinstance(candidate, ECDF):
+            return candidate
+        def compute():
+            dist = candidate
+            if self.remove_outliers:
+                dist = self._get_inliers(dist)
+            return _to_ecdf(dist)
+        return self._memoize(
+            "ecdf", candidate,
+            (self.remove_outliers, self.outlier_method),
+            compute
+        )
+
+    def score(self, candidate):
+        """
+        The fraction of the reference within boundary of candidate,
+        same as compare_cdf_*(reference, candidate, ...).
+        """
+        within_boundary = self.cdf.within_boundary(
+            self._get_cdf(candidate), self.spread,
+            self.max_deviance,
+            distance_function=self.distance_function
+        )
+        return within_boundary.sum()/self.cdf.count
+
+    def compare(self, candidates):
+        """
+        Scores every candidate distribution against the reference.
+        candidates is an iterable of arrays, FrequencyTables or ECDFs,
+        returns an array with one score per candidate.
+        """
+        return np.array([
+            self.score(candidate) for candidate in candidates
+        ], dtype=float)
 
 def compare_cdf_mean_absolute_deviation(dist_one, dist_two,
                                         max_deviance,
                                         distance_function=None,
-                                        remove_outliers=True):
+                                        remove_outliers=True,
+                                        outlier_method="isolation_forest",
+                                        cache=None):
     """
     We assume dist_one and dist_two are of the same size.
     I.E. len(dist_one) == len(dist_two)
     
     Please see doc string for isclose.
     """
-    if remove_outliers:
-        dist_one = get_inliers(dist_one)
-        dist_two = get_inliers(dist_two)
-    cdf_one = _get_cdf(dist_one)
-    cdf_two = _get_cdf(dist_two)
-    mad = mean_absolute_deviation(_get_prob_values(cdf_one))
-    within_boundary = get_within_boundary(
-        cdf_one, cdf_two, mad,
-        max_deviance,
-        distance_function=distance_function
+    reference = ReferenceDistribution(
+        dist_one, max_deviance,
+        spread="mean_absolute_deviation",
+        distance_function=distance_function,
+        remove_outliers=remove_outliers,
+        outlier_method=outlier_method,
+        cache=cache
     )
-    return (within_boundary).sum()/len(dist_one)
+    return reference.score(dist_two)
 
 def compare_cdf_median_absolute_deviation(dist_one, dist_two,
                                           max_deviance,
                                           distance_function=None,
-                                          remove_outliers=True):
+                                          remove_outliers=True,
+                                          outlier_method="isolation_forest",
+                                          cache=None):
     """
     We assume dist_one and dist_two are of the same size.
     I.E. len(dist_one) == len(dist_two)
 
     Please see doc string for isclose
     """
-    if remove_outliers:
-        dist_one = get_inliers(dist_one)
-        dist_two = get_inliers(dist_two)
-    cdf_one = _get_cdf(dist_one)
-    cdf_two = _get_cdf(dist_two)
-    mad = median_absolute_deviation(_get_prob_values(cdf_one))
-    within_boundary = get_within_boundary(
-        cdf_one, cdf_two, mad,
-        max_deviance,
-        distance_function=distance_function
+    reference = ReferenceDistribution(
+        dist_one, max_deviance,
+        spread="median_absolute_deviation",
+        distance_function=distance_function,
+        remove_outliers=remove_outliers,
+        outlier_method=outlier_method,
+        cache=cache
     )
-    return (within_boundary).sum()/len(dist_one)
+    return reference.score(dist_two)
 
 def compare_cdf_trimean_absolute_deviation(dist_one, dist_two,
                                            max_deviance,
                                            distance_function=None,
-                                           remove_outliers=True):
+                                           remove_outliers=True,
+                                           outlier_method="isolation_forest",
+                                           cache=None):
     """
     We assume dist_one and dist_two are of the same size.
     I.E. len(dist_one) == len(dist_two)
 
     Please see doc string for isclose
     """
-    if remove_outliers:
-        dist_one = get_inliers(dist_one)
-        dist_two = get_inliers(dist_two)
-    cdf_one = _get_cdf(dist_one)
-    cdf_two = _get_cdf(dist_two)
-    tad = trimean_absolute_deviation(_get_prob_values(cdf_one))
-    within_boundary = get_within_boundary(
-        cdf_one, cdf_two, tad,
-        max_deviance,
-        distance_function=distance_function
+    reference = ReferenceDistribution(
+        dist_one, max_deviance,
+        spread="trimean_absolute_deviation",
+        distance_function=distance_function,
+        remove_outliers=remove_outliers,
+        outlier_method=outlier_method,
+        cache=cache
     )
-    return (within_boundary).sum()/len(dist_one)
+    return reference.score(dist_two)
 
 def compare_cdf_hard_coded_boundary(dist_one, dist_two,
                                     max_deviance,
                                     distance_function=None,
                                     boundary=0.01,
-                                    remove_outliers=True):
+                                    remove_outliers=True,
+                                    outlier_method="isolation_forest",
+                                    cache=None):
     """
     We assume dist_one and dist_two are of the same size.
     I.E. len(dist_one) == len(dist_two)
 
     Please see doc string for isclose
     """
-    if remove_outliers:
-        dist_one = get_inliers(dist_one)
-        dist_two = get_inliers(dist_two)
-    cdf_one = _get_cdf(dist_one)
-    cdf_two = _get_cdf(dist_two)
-    within_boundary = get_within_boundary(
-        cdf_one, cdf_two, boundary,
-        max_deviance,
-        distance_function=distance_function
+    reference = ReferenceDistribution(
+        dist_one, max_deviance,
+        spread="hard_coded_boundary",
+        boundary=boundary,
+        distance_function=distance_function,
+        remove_outliers=remove_outliers,
+        outlier_method=outlier_method,
+        cache=cache
     )
-    return (within_boundary).sum()/len(dist_one)
+    return reference.score(dist_two)
 
 # things like this
-# trimmed statistics
 # investigate here: https://en.wikipedia.org/wiki/Descriptive_statistics
@@ -0,0 +1,136 @@
+import numpy as np
+from describer_ml._lazy import lazy_import
+from describer_ml.numeric.cache import LRUCache, fingerprint
+from describer_ml.numeric.frequency import FrequencyTable
+
+ensemble = lazy_import("sklearn.ensemble")
+
+class MADFilter:
+    """
+    Flags outliers by their modified z-score,
+    0.6745 * (x - median) / median(|x - median|), see:
+    Iglewicz and Hoaglin, "How to Detect and Handle Outliers" (1993)
+
+    Runs in O(n), the median is found by selection rather than sorting.
+    """
+    def __init__(self, threshold=3.5):
+        self.threshold = threshold
+
+    def inlier_mask(self, dist):
+        if isinstance(dist, FrequencyTable):
+            deviations = np.abs(dist.values - dist.median())
+            mad = FrequencyTable(deviations, dist.counts).median()
+        else:
+            dist = np.asarray(dist, dtype=float)
+            deviations = np.abs(dist - np.median(dist))
+            mad = np.median(deviations)
+        if mad == 0:
+            # more than half the values are equal, keep just those
+            return deviations == 0
+        return 0.6745 * deviations / mad <= self.threshold
+
+class IQRFilter:
+    """
+    Flags outliers outside Tukey's fences,
+    [q1 - k * iqr, q3 + k * iqr].
+
+    Runs in O(n), the quartiles are found by selection rather than sorting.
+    """
+    def __init__(self, k=1.5):
+        self.k = k
+
+    def inlier_mask(self, dist):
+        if isinstance(dist, FrequencyTable):
+            q1, q3 = dist.quantile([0.25, 0.75])
+            dist = dist.values
+        else:
+            dist = np.asarray(dist, dtype=float)
+            q1, q3 = np.quantile(dist, [0.25, 0.75])
+        spread = self.k * (q3 - q1)
+        return (dist >= q1 - spread) & (dist <= q3 + spread)
+
+class IsolationForestFilter:
+    """
+    Flags outliers with sklearn's IsolationForest.
+
+    @subsample - fit on at most this many randomly chosen values,
+    then predict on all of them.  None fits on everything.
+    @n_jobs - passed on to IsolationForest
+    FrequencyTables are fit on their distinct values, weighted by
+    their counts, and are not subsampled.
+
+    @cache_size - how many fitted models (and their inlier masks)
+    to keep, keyed by a fingerprint of the data, so filtering the same
+    distribution again does not refit.
+    """
+    def __init__(self, n_estimators=100, max_samples="auto",
+                 contamination="auto", subsample=None,
+                 n_jobs=None, random_state=None,
+                 cache_size=32):
+        self.n_estimators = n_estimators
+        self.max_samples = max_samples
+        self.contamination = contamination
+        self.subsample = subsample
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.cache = LRUCache(maxsize=cache_size)
+
+    def _options(self):
+        return (
+            self.n_estimators, self.max_samples, self.contamination,
+            self.subsample, self.random_state
+        )
+
+    def _fit(self, dist, sample_weight=None):
+        clf = ensemble.IsolationForest(
+            n_estimators=self.n_estimators,
+            max_samples=self.max_samples,
+            contamination=self.contamination,
+            n_jobs=self.n_jobs,
+            random_state=self.random_state
+        )
+        if sample_weight is not None:
+            return clf.fit(dist.reshape(-1, 1), sample_weight=sample_weight)
+        sample = dist
+        if self.subsample is not None and len(dist) > self.subsample:
+            rng = np.random.default_rng(self.random_state)
+            sample = dist[rng.choice(len(dist), self.subsample, replace=False)]
+        return clf.fit(sample.reshape(-1, 1))
+
+    def _fit_predict(self, dist):
+        sample_weight = None
+        if isinstance(dist, FrequencyTable):
+            key = fingerprint(dist.values, dist.counts, *self._options())
+            dist, sample_weight = dist.values, dist.counts
+        else:
+            dist = np.asarray(dist, dtype=float)
+            key = fingerprint(dist, *self._options())
+        entry = self.cache.get(key)
+        if entry is None:
+            model = self._fit(dist, sample_weight=sample_weight)
+            entry = (model, model.predict(dist.reshape(-1, 1)) != -1)
+            self.cache.put(key, entry)
+        return entry
+
+    def fitted_model(self, dist):
+        return self._fit_predict(dist)[0]
+
+    def inlier_mask(self, dist):
+        return self._fit_predict(dist)[1]
+
+OUTLIER_FILTERS = {
+    "isolation_forest": IsolationForestFilter(),
+    "mad": MADFilter(),
+    "iqr": IQRFilter()
+}
+
+def get_outlier_filter(method):
+    """
+    @method - a name from OUTLIER_FILTERS, or any object with an
+    inlier_mask(dist) method returning a boolean array.
+    """
+    if isinstance(method, str):
+        if method not in OUTLIER_FILTERS:
+            raise ValueError("Unknown outlier filter: {}".format(method))
+        return OUTLIER_FILTERS[method]
+    return method
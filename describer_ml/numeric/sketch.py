@@ -0,0 +1,198 @@
+import struct
+import numpy as np
+from describer_ml.numeric.frequency import FrequencyTable
+
+class QuantileSketch:
+    """
+    A KLL quantile sketch, see:
+    Karnin, Lang, Liberty, "Optimal Quantile Approximation in Streams" (2016)
+    https://arxiv.org/abs/1603.05346
+
+    The sketch keeps a bounded number of items no matter how many
+    values it has seen; roughly 3*k items plus a few per level, so
+    with the default k=200 about 5KB.  Items at level h stand in for
+    2**h values of the stream.  When a level grows over its capacity
+    it is sorted and, out of a run of neighbouring items, every other
+    item, starting from a random offset, is promoted to the next level.
+
+    Rank error guarantee: a quantile query returns an item whose true
+    normalized rank is within about 2.296 / k**0.9723 of the requested
+    one with 99% confidence (1.33% for k=200, 0.68% for k=400).
+    This is the empirical bound measured for the Apache DataSketches
+    KLL implementation, which uses the same compaction scheme,
+    see normalized_rank_error.
+
+    nan values are ignored, like the *_with_nan functions in num_stats.
+
+    Sketches built on different chunks or shards with the same k can be
+    combined with merge and shipped between processes with to_bytes
+    and from_bytes.
+    """
+    _MAGIC = b"KLLS"
+    _VERSION = 1
+    _HEADER = struct.Struct("<4sBIQddI")
+    _CAPACITY_DECAY = 2/3
+
+    def __init__(self, k=200, seed=None):
+        if k < 8:
+            raise ValueError("k must be at least 8")
+        self.k = k
+        self.count = 0
+        self.minimum = np.nan
+        self.maximum = np.nan
+        self._levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def normalized_rank_error(self):
+        return 2.296 / self.k**0.9723
+
+    @property
+    def num_retained(self):
+        return sum(len(level) for level in self._levels)
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=float).ravel()
+        chunk = chunk[~np.isnan(chunk)]
+        if len(chunk) == 0:
+            return self
+        self.minimum = np.fmin(self.minimum, chunk.min())
+        self.maximum = np.fmax(self.maximum, chunk.max())
+        self.count += len(chunk)
+        self._levels[0] = np.concatenate([self._levels[0], chunk])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        if self.k != other.k:
+            raise ValueError("Cannot merge sketches with different k")
+        if other.count == 0:
+            return self
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for height, level in enumerate(other._levels):
+            self._levels[height] = np.concatenate([self._levels[height], level])
+        self.minimum = np.fmin(self.minimum, other.minimum)
+        self.maximum = np.fmax(self.maximum, other.maximum)
+        self.count += other.count
+        self._compress()
+        return self
+
+    def _capacity(self, height):
+        depth = len(self._levels) - height - 1
+        return max(2, int(np.ceil(self.k * self._CAPACITY_DECAY**depth)))
+
+    def _compress(self):
+        height = 0
+        while height < len(self._levels):
+            level = self._levels[height]
+            if len(level) <= self._capacity(height):
+                height += 1
+                continue
+            if height + 1 == len(self._levels):
+                self._levels.append(np.empty(0))
+            level = np.sort(level)
+            # compact all but half a level of neighbouring items, so a
+            # large chunk does not flush every lower level at once
+            compacted = len(level) - self._capacity(height) // 2
+            compacted -= compacted % 2
+            if self._rng.integers(2):
+                kept, paired = level[compacted:], level[:compacted]
+            else:
+                kept, paired = level[:-compacted], level[-compacted:]
+            promoted = paired[self._rng.integers(2)::2]
+            self._levels[height] = kept
+            self._levels[height + 1] = np.concatenate([
+                self._levels[height + 1], promoted
+            ])
+            # capacities shrink as the sketch grows, start over
+            height = 0
+
+    def _weighted_items(self):
+        items = np.concatenate(self._levels)
+        weights = np.concatenate([
+            np.full(len(level), 2**height, dtype=float)
+            for height, level in enumerate(self._levels)
+        ])
+        order = np.argsort(items, kind="mergesort")
+        return items[order], weights[order]
+
+    def to_frequency_table(self):
+        """
+        The retained items, each weighted by the number of values it
+        stands in for, so FrequencyTable statistics and ECDFs can be
+        computed from the sketch.
+        """
+        items, weights = self._weighted_items()
+        return FrequencyTable(items, weights)
+
+    def rank(self, value):
+        """
+        Approximate fraction of the values which are <= value.
+        """
+        items, weights = self._weighted_items()
+        cumulative = np.concatenate([[0], np.cumsum(weights)])
+        index = np.searchsorted(items, value, side="right")
+        return cumulative[index] / cumulative[-1]
+
+    def quantile(self, q):
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan)[()]
+        q = np.asarray(q, dtype=float)
+        if np.any((q < 0) | (q > 1)):
+            raise ValueError("Quantiles must be in the range [0, 1]")
+        items, weights = self._weighted_items()
+        # rank each item at the middle of the weight it stands in for
+        midpoints = np.cumsum(weights) - weights/2
+        index = np.searchsorted(midpoints, q * self.count, side="left")
+        result = items[np.clip(index, 0, len(items) - 1)]
+        result = np.where(q == 0, self.minimum, result)
+        result = np.where(q == 1, self.maximum, result)
+        return result[()]
+
+    def median(self):
+        return self.quantile(0.5)
+
+    def interquartile_range(self):
+        q1, q3 = self.quantile([0.25, 0.75])
+        return q3 - q1
+
+    def trimean(self):
+        q1, q2, q3 = self.quantile([0.25, 0.5, 0.75])
+        return (q1 + 2*q2 + q3)/4
+
+    def midhinge(self):
+        q1, q3 = self.quantile([0.25, 0.75])
+        return (q1 + q3)/2
+
+    def interquartile_mean(self):
+        q1, q3 = self.quantile([0.25, 0.75])
+        items, weights = self._weighted_items()
+        mask = (items >= q1) & (items <= q3)
+        return np.average(items[mask], weights=weights[mask])
+
+    def to_bytes(self):
+        header = self._HEADER.pack(
+            self._MAGIC, self._VERSION, self.k, self.count,
+            self.minimum, self.maximum, len(self._levels)
+        )
+        sizes = np.array([len(level) for level in self._levels], dtype="<u8")
+        items = np.concatenate(self._levels).astype("<f8")
+        return header + sizes.tobytes() + items.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data, seed=None):
+        magic, version, k, count, minimum, maximum, num_levels = \
+            cls._HEADER.unpack_from(data)
+        if magic != cls._MAGIC or version != cls._VERSION:
+            raise ValueError("Not a serialized QuantileSketch")
+        offset = cls._HEADER.size
+        sizes = np.frombuffer(data, dtype="<u8", count=num_levels, offset=offset)
+        offset += sizes.nbytes
+        items = np.frombuffer(data, dtype="<f8", count=int(sizes.sum()), offset=offset)
+        sketch = cls(k=k, seed=seed)
+        sketch.count = count
+        sketch.minimum = minimum
+        sketch.maximum = maximum
+        boundaries = np.cumsum(sizes)[:-1].astype(int)
+        sketch._levels = [level.astype(float) for level in np.split(items, boundaries)]
+        return sketch
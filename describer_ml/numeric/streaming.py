@@ -0,0 +1,117 @@
+import numpy as np
+
+class MomentAccumulator:
+    """
+    Accumulates the first four central moments of a stream of chunks.
+
+    Chunks are folded in with update and two accumulators, for instance
+    built by different worker processes, are combined with merge.
+    Both use the pairwise update formulas from:
+    Pebay, "Formulas for Robust, One-Pass Parallel Computation of
+    Covariances and Arbitrary-Order Statistical Moments" (2008)
+    https://www.osti.gov/biblio/1028931
+    which stay numerically stable for large counts, unlike
+    accumulating raw power sums.
+
+    The results match num_stats.mean, variance, standard_deviation,
+    skew, kurtosis and variation on the concatenated data.
+    If ignore_nan is True nan values are skipped, matching the
+    *_with_nan variants, otherwise any nan makes every result nan.
+    """
+    def __init__(self, ignore_nan=False):
+        self.ignore_nan = ignore_nan
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._m3 = 0.0
+        self._m4 = 0.0
+        self._nan_seen = False
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=float).ravel()
+        nan_mask = np.isnan(chunk)
+        if nan_mask.any():
+            if not self.ignore_nan:
+                self._nan_seen = True
+            chunk = chunk[~nan_mask]
+        if len(chunk) == 0:
+            return self
+        mean = chunk.mean()
+        deviations = chunk - mean
+        squared_deviations = deviations * deviations
+        self._combine(
+            len(chunk), mean,
+            squared_deviations.sum(),
+            (squared_deviations * deviations).sum(),
+            (squared_deviations * squared_deviations).sum()
+        )
+        return self
+
+    def merge(self, other):
+        if self.ignore_nan != other.ignore_nan:
+            raise ValueError(
+                "Cannot merge accumulators with different ignore_nan settings"
+            )
+        self._nan_seen = self._nan_seen or other._nan_seen
+        if other.count:
+            self._combine(
+                other.count, other._mean,
+                other._m2, other._m3, other._m4
+            )
+        return self
+
+    def _combine(self, count, mean, m2, m3, m4):
+        if self.count == 0:
+            self.count = count
+            self._mean, self._m2, self._m3, self._m4 = mean, m2, m3, m4
+            return
+        n_a, n_b = self.count, count
+        n = n_a + n_b
+        delta = mean - self._mean
+        delta_n = delta / n
+        self._m4 = (
+            self._m4 + m4
+            + delta * delta_n**3 * n_a * n_b * (n_a*n_a - n_a*n_b + n_b*n_b)
+            + 6 * delta_n**2 * (n_a*n_a*m2 + n_b*n_b*self._m2)
+            + 4 * delta_n * (n_a*m3 - n_b*self._m3)
+        )
+        self._m3 = (
+            self._m3 + m3
+            + delta * delta_n**2 * n_a * n_b * (n_a - n_b)
+            + 3 * delta_n * (n_a*m2 - n_b*self._m2)
+        )
+        self._m2 = self._m2 + m2 + delta * delta_n * n_a * n_b
+        self._mean = self._mean + delta_n * n_b
+        self.count = n
+
+    def _undefined(self):
+        return self._nan_seen or self.count == 0
+
+    def mean(self):
+        if self._undefined():
+            return np.nan
+        return self._mean
+
+    def variance(self):
+        if self._undefined():
+            return np.nan
+        return self._m2 / self.count
+
+    def standard_deviation(self):
+        return np.sqrt(self.variance())
+
+    def skew(self):
+        if self._undefined():
+            return np.nan
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.float64(self._m3 / self.count) / (self._m2 / self.count)**1.5
+
+    def kurtosis(self):
+        if self._undefined():
+            return np.nan
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.float64(self._m4 * self.count) / self._m2**2 - 3
+
+    def variation(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.float64(self.standard_deviation()) / self.mean()
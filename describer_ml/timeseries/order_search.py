@@ -0,0 +1,302 @@
+import signal
+import threading
+import time
+import warnings
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+import numpy as np
+from describer_ml._lazy import lazy_import
+
+pd = lazy_import("pandas")
+arima_model = lazy_import("statsmodels.tsa.arima.model")
+
+EXECUTORS = {
+    "serial": None,
+    "process": ProcessPoolExecutor
+}
+
+CRITERIA = ("aic", "bic", "hqic")
+
+OrderFit = namedtuple("OrderFit", "score status seconds")
+
+class FitTimeout(BaseException):
+    """
+    Raised in a fit which ran out of time.  Not an Exception, so the
+    fallbacks statsmodels wraps around its optimisers don't catch it.
+    """
+
+def _raise_timeout(signum, frame):
+    raise FitTimeout()
+
+@contextmanager
+def time_limit(seconds):
+    """
+    Raises FitTimeout in the block once seconds have passed, with
+    signal.setitimer.  Only the main thread of a process can take
+    signals, elsewhere (and for None) there is no limit.
+
+    An interval timer the caller already has running is kept: re-armed
+    afterwards with what was left of it, or, if it is due before
+    seconds are up, left to fire as it would have, with no limit of
+    its own.
+    """
+    if (seconds is None or not hasattr(signal, "setitimer") or
+            threading.current_thread() is not threading.main_thread()):
+        yield
+        return
+    seconds = max(seconds, 1e-3)
+    previous = signal.signal(signal.SIGALRM, _raise_timeout)
+    start = time.monotonic()
+    caller_delay, caller_interval = signal.setitimer(signal.ITIMER_REAL, seconds)
+    if 0 < caller_delay < seconds:
+        signal.signal(signal.SIGALRM, previous)
+        signal.setitimer(signal.ITIMER_REAL, caller_delay, caller_interval)
+        yield
+        return
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+        if caller_delay > 0:
+            signal.setitimer(
+                signal.ITIMER_REAL,
+                max(caller_delay - (time.monotonic() - start), 1e-6),
+                caller_interval
+            )
+
+def _timed(function, args, timeout, deadline=None):
+    """
+    Runs function(*args) under time_limit, as an OrderFit; failures
+    are recorded rather than raised.  deadline is a time.time() value,
+    wall clock so worker processes agree on it, which the call is
+    held to as well; past it the call isn't started.
+    """
+    start = time.perf_counter()
+    # which limit a FitTimeout comes from
+    out_of_time = "timeout"
+    if deadline is not None:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return OrderFit(np.nan, "budget", 0.0)
+        if timeout is None or remaining < timeout:
+            timeout, out_of_time = remaining, "budget"
+    try:
+        with time_limit(timeout), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            score = function(*args)
+        status = "ok"
+    except FitTimeout:
+        score, status = np.nan, out_of_time
+    except Exception as error:
+        score, status = np.nan, "error: {}".format(type(error).__name__)
+    return OrderFit(score, status, time.perf_counter() - start)
+
+def _information_criterion(timeseries, order, criterion):
+    result = arima_model.ARIMA(timeseries, order=order).fit()
+    return float(getattr(result, criterion))
+
+def fit_criterion(timeseries, order, criterion="aic", timeout=None, deadline=None):
+    return _timed(_information_criterion, (timeseries, order, criterion), timeout, deadline)
+
+def evaluate_order(timeseries, order, evaluate, timeout=None, deadline=None):
+    return _timed(evaluate, (timeseries, order), timeout, deadline)
+
+def _remaining(deadline):
+    return None if deadline is None else deadline - time.time()
+
+def _run(function, calls, executor, n_jobs, timeout, deadline, on_result=None):
+    """
+    Runs function(*args, timeout, deadline) for each {key: args} in
+    order, until deadline (a time.time() value, or None).
+    on_result(key, result) may return keys of calls to skip.
+
+    Returns {key: result} of the calls which finished and the set of
+    keys skipped; the rest ran out of time.
+    """
+    results = {}
+    skipped = set()
+    if EXECUTORS[executor] is None:
+        for key, args in calls.items():
+            remaining = _remaining(deadline)
+            if key in skipped or (remaining is not None and remaining <= 0):
+                continue
+            results[key] = function(*args, timeout, deadline)
+            if on_result is not None:
+                skipped |= on_result(key, results[key])
+        return results, skipped
+    pool = EXECUTORS[executor](max_workers=n_jobs)
+    futures = {}
+    try:
+        for key, args in calls.items():
+            futures[pool.submit(function, *args, timeout, deadline)] = key
+        pending = set(futures)
+        while pending:
+            remaining = _remaining(deadline)
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = futures[future]
+                results[key] = future.result()
+                if on_result is None:
+                    continue
+                skip = on_result(key, results[key])
+                skipped |= skip
+                for other in pending:
+                    if futures[other] in skip:
+                        other.cancel()
+            pending = {future for future in pending if not future.cancelled()}
+    finally:
+        for future in futures:
+            future.cancel()
+        # fits already running stop at the deadline by their own
+        # timer; without setitimer they can't be, and are abandoned
+        # to finish in the background
+        pool.shutdown(wait=hasattr(signal, "setitimer"))
+    return results, skipped
+
+class _ChainPruner:
+    """
+    Orders with the same d and q form a chain in p.  Once a chain's
+    criterion has not improved on its best for patience p values in a
+    row, the larger p of the chain are skipped.
+    """
+    def __init__(self, orders, patience):
+        self.patience = patience
+        self.chains = {}
+        for order in orders:
+            self.chains.setdefault(order[1:], []).append(order)
+        for chain in self.chains.values():
+            chain.sort()
+        self.scores = {}
+
+    def __call__(self, order, fit):
+        self.scores[order] = fit.score
+        chain = self.chains[order[1:]]
+        best, worse = np.inf, 0
+        for position, member in enumerate(chain):
+            if member not in self.scores:
+                return set()
+            score = self.scores[member]
+            if score < best:
+                best, worse = score, 0
+            else:
+                worse += 1
+            if worse >= self.patience:
+                return {
+                    later for later in chain[position + 1:]
+                    if later not in self.scores
+                }
+        return set()
+
+def search_orders(timeseries, orders, evaluate=None,
+                  criterion="aic",
+                  executor="process",
+                  n_jobs=None,
+                  fit_timeout=60,
+                  time_budget=None,
+                  patience=2,
+                  max_delta=10):
+    """
+    Scores ARIMA (p, d, q) orders in two stages sharing one time budget.
+
+    1. every order is fitted once for its information criterion.
+       Chains of orders differing only in p are cut short once larger p
+       stops helping (see patience), and orders whose criterion is more
+       than max_delta above the best with the same d are dropped; a
+       difference over 10 leaves a model essentially no support
+       (Burnham and Anderson, "Model Selection and Multimodel
+       Inference", 2002)
+    2. evaluate(timeseries, order), an out of sample error, is run for
+       the orders left, if given
+
+    @orders - the (p, d, q) tuples to try
+    @evaluate - a picklable function for stage 2, lower is better
+    @criterion - "aic", "bic" or "hqic"
+    @executor - "serial" or "process"
+    @n_jobs - worker processes, None lets the executor decide
+    @fit_timeout - seconds each fit or evaluation may take, None for no
+    limit.  Enforced with signal.setitimer, so only on platforms
+    which have it.
+    @time_budget - seconds for the whole search, None for no limit;
+    orders not reached in time are marked "budget".  Fits running when
+    it is spent are stopped like timed out ones, so nothing is left
+    running once the search returns; without signal.setitimer they
+    are abandoned instead, to finish in their worker process.
+    @patience - see stage 1, None never cuts a chain short
+    @max_delta - see stage 1, None keeps every order
+
+    Returns a DataFrame with a row per order (a p, d, q index) of the
+    criterion, the evaluation score, each stage's status and the
+    seconds it took, sorted best first.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError("Unknown executor: {}".format(executor))
+    if criterion not in CRITERIA:
+        raise ValueError("Unknown criterion: {}".format(criterion))
+    timeseries = np.asarray(timeseries, dtype=float)
+    orders = [tuple(order) for order in orders]
+    deadline = None if time_budget is None else time.time() + time_budget
+
+    fits, pruned = _run(
+        fit_criterion,
+        {order: (timeseries, order, criterion) for order in orders},
+        executor, n_jobs, fit_timeout, deadline,
+        on_result=None if patience is None else _ChainPruner(orders, patience)
+    )
+    criteria = {order: fit.score for order, fit in fits.items()}
+    if max_delta is not None:
+        for order, score in criteria.items():
+            same_d = [other for other_order, other in criteria.items()
+                      if other_order[1] == order[1] and np.isfinite(other)]
+            if np.isfinite(score) and score > min(same_d) + max_delta:
+                pruned.add(order)
+    finite = [order for order, score in criteria.items() if np.isfinite(score)]
+    survivors = [order for order in orders if order in finite and order not in pruned]
+
+    evaluations = {}
+    if evaluate is not None and survivors:
+        evaluations, _ = _run(
+            evaluate_order,
+            {order: (timeseries, order, evaluate) for order in survivors},
+            executor, n_jobs, fit_timeout, deadline
+        )
+
+    rows = []
+    for order in orders:
+        fit = fits.get(order)
+        if fit is not None:
+            fit_status = fit.status
+        else:
+            fit_status = "pruned" if order in pruned else "budget"
+        evaluation = evaluations.get(order)
+        if evaluation is not None:
+            evaluation_status = evaluation.status
+        elif evaluate is None or fit is None or fit.status != "ok":
+            evaluation_status = None
+        else:
+            evaluation_status = "pruned" if order in pruned else "budget"
+        rows.append({
+            "p": order[0], "d": order[1], "q": order[2],
+            criterion: np.nan if fit is None else fit.score,
+            "fit_status": fit_status,
+            "fit_seconds": np.nan if fit is None else fit.seconds,
+            "score": np.nan if evaluation is None else evaluation.score,
+            "score_status": evaluation_status,
+            "score_seconds": np.nan if evaluation is None else evaluation.seconds,
+        })
+    table = pd.DataFrame(rows).set_index(["p", "d", "q"])
+    return table.sort_values(["score", criterion], na_position="last", kind="stable")
+
+def best_order(table, default=(1, 0, 0)):
+    """
+    The order at the top of a search_orders table: the best evaluation
+    score, or else the best criterion, or else default.
+    """
+    for column in ["score", table.columns[0]]:
+        scored = table[column].dropna()
+        if len(scored):
+            return tuple(int(value) for value in scored.idxmin())
+    return default
@@ -0,0 +1,354 @@
+import numpy as np
+from describer_ml._lazy import lazy_import
+from describer_ml.timeseries.timeseries import (
+    ForecastTerms, METRICS, _as_series, _per_series, _ratio, evaluate
+)
+
+pd = lazy_import("pandas")
+
+# the metrics an accumulator can keep exactly from running sums;
+# the medians need every term and are only available windowed
+STREAMING_METRICS = [
+    "unscaled_mean_bounded_relative_absolute_error",
+    "mean_bounded_relative_absolute_error",
+    "mean_absolute_percentage_error",
+    "root_mean_squared_error",
+    "mean_relative_absolute_error",
+    "symmetric_mean_absolute_percentage_error",
+    "mean_absolute_scaled_error",
+    "geometric_mean_relative_absolute_error",
+]
+
+# (sum, count) pairs kept per series
+_SUMS = [
+    "squared_errors", "absolute_errors", "count",
+    "absolute_percentage_errors", "absolute_percentage_count",
+    "symmetric_absolute_percentage_errors", "symmetric_count",
+    "naive_errors", "naive_count",
+    "relative_absolute_errors", "log_relative_absolute_errors", "relative_count",
+    "bounded_relative_absolute_errors", "bounded_count",
+]
+
+def _weighted_sum(terms, weights, skip_nan=True):
+    """
+    The sums of the weighted terms per series, and their total weight.
+    Undefined (NaN) terms are left out if skip_nan, as the metrics
+    with a ratio per term do, otherwise they make the sum NaN.
+    """
+    if not skip_nan:
+        return np.sum(terms * weights, axis=-1), np.full(len(terms), np.sum(weights))
+    defined = ~np.isnan(terms)
+    return (
+        np.sum(terms * weights, axis=-1, where=defined),
+        np.sum(np.broadcast_to(weights, terms.shape), axis=-1, where=defined)
+    )
+
+class _StreamingMetrics:
+    """
+    The metric methods shared by the streaming accumulators, named as
+    in TimeSeriesMetrics.
+    """
+    def unscaled_mean_bounded_relative_absolute_error(self):
+        return self.score("unscaled_mean_bounded_relative_absolute_error")
+
+    def mean_bounded_relative_absolute_error(self):
+        return self.score("mean_bounded_relative_absolute_error")
+
+    def mean_absolute_percentage_error(self):
+        return self.score("mean_absolute_percentage_error")
+
+    def root_mean_squared_error(self):
+        return self.score("root_mean_squared_error")
+
+    def mean_relative_absolute_error(self):
+        return self.score("mean_relative_absolute_error")
+
+    def symmetric_mean_absolute_percentage_error(self):
+        return self.score("symmetric_mean_absolute_percentage_error")
+
+    def mean_absolute_scaled_error(self):
+        return self.score("mean_absolute_scaled_error")
+
+    def geometric_mean_relative_absolute_error(self):
+        return self.score("geometric_mean_relative_absolute_error")
+
+    def _check_series(self, y_true, y_pred):
+        y_true, y_pred, single = _as_series(y_true, y_pred)
+        if self.n_series is None:
+            # nothing stored yet, an empty first batch doesn't pin the shape
+            self.single = single
+        elif y_true.shape[0] != self.n_series or single != self.single:
+            raise ValueError("Batches must hold the same series as before")
+        return y_true, y_pred
+
+class ForecastErrorAccumulator(_StreamingMetrics):
+    """
+    Forecast error metrics of a stream of forecasts, updated a batch
+    of actuals at a time in O(batch) from running sums.
+
+    The relative errors pair |Y[i] - F[i]| with |Y[i+1] - Y[i]|, so the
+    last observation of a batch is carried over and its term added
+    once the next batch arrives; the results equal TimeSeriesMetrics
+    on the concatenated batches, zero denominators included.
+    Batches are one series, or (n_series, batch) for several series
+    scored side by side.
+
+    Two accumulators of consecutive stretches of the same series, for
+    instance filled by different workers, are combined with merge.
+
+    @decay - None weighs every observation the same, otherwise an
+    observation k steps old weighs decay**k, so the results track
+    recent errors
+    """
+    def __init__(self, decay=None):
+        if decay is not None and not 0 < decay <= 1:
+            raise ValueError("decay must be in (0, 1]")
+        self.decay = decay
+        self.single = None
+        self.n_series = None
+        self.n_observations = 0
+        self.sums = {}
+        self._first = None
+        self._last = None
+
+    def _factor(self, steps):
+        if self.decay is None:
+            return np.ones(np.shape(steps))
+        return self.decay ** np.asarray(steps, dtype=float)
+
+    def _start(self, n_series):
+        self.n_series = n_series
+        self.sums = {name: np.zeros(n_series) for name in _SUMS}
+
+    def _add(self, name, total, count, count_name):
+        self.sums[name] += total
+        if count_name is not None:
+            self.sums[count_name] += count
+
+    def update(self, y_true, y_pred):
+        """
+        Adds the next batch of actuals and their forecasts.
+        """
+        y_true, y_pred = self._check_series(y_true, y_pred)
+        size = y_true.shape[-1]
+        if size == 0:
+            return self
+        if self.n_series is None:
+            self._start(y_true.shape[0])
+            self._first = (y_true[:, :1].copy(), y_pred[:, :1].copy())
+        carried = self._last is not None
+        if carried:
+            y_true = np.concatenate([self._last[0], y_true], axis=-1)
+            y_pred = np.concatenate([self._last[1], y_pred], axis=-1)
+        terms = ForecastTerms(y_true, y_pred)
+        # the age of each position of the (extended) batch
+        weights = self._factor(np.arange(y_true.shape[-1] - 1, -1, -1))
+        new = slice(1, None) if carried else slice(None)
+        for name in self.sums:
+            self.sums[name] *= self._factor(size)
+
+        errors = terms.errors[:, new]
+        self._add("squared_errors", *_weighted_sum(errors**2, weights[new], skip_nan=False), "count")
+        self.sums["absolute_errors"] += _weighted_sum(np.abs(errors), weights[new], skip_nan=False)[0]
+        self._add("absolute_percentage_errors", *_weighted_sum(
+            _ratio(terms.absolute_errors[:, new], np.abs(terms.y_true[:, new])), weights[new]
+        ), "absolute_percentage_count")
+        self._add("symmetric_absolute_percentage_errors", *_weighted_sum(
+            terms.symmetric_absolute_percentage_errors[:, new], weights[new]
+        ), "symmetric_count")
+        self._accumulate_relative(
+            terms.naive_errors, terms.relative_absolute_errors,
+            terms.bounded_relative_absolute_errors, weights
+        )
+        self.n_observations += size
+        self._last = (y_true[:, -1:].copy(), y_pred[:, -1:].copy())
+        return self
+
+    def _accumulate_relative(self, naive_errors, relative, bounded, weights):
+        """
+        The naive differences, each weighed as the later observation of
+        its pair, and the relative errors, weighed as the earlier one.
+        """
+        self._add("naive_errors", *_weighted_sum(naive_errors, weights[1:], skip_nan=False), "naive_count")
+        self._add("relative_absolute_errors", *_weighted_sum(relative, weights[:-1]), "relative_count")
+        with np.errstate(divide="ignore"):
+            self.sums["log_relative_absolute_errors"] += _weighted_sum(
+                np.log(relative), weights[:-1]
+            )[0]
+        self._add("bounded_relative_absolute_errors", *_weighted_sum(bounded, weights[:-1]), "bounded_count")
+
+    def merge(self, other):
+        """
+        Adds other, an accumulator of the stretch of the series right
+        after this one's, as if its batches had been passed to update.
+        """
+        if self.decay != other.decay:
+            raise ValueError("Cannot merge accumulators with different decay")
+        if other.n_series is None:
+            return self
+        if self.n_series is None:
+            self.single, self.n_series = other.single, other.n_series
+            self.n_observations = other.n_observations
+            self.sums = {name: total.copy() for name, total in other.sums.items()}
+            self._first, self._last = other._first, other._last
+            return self
+        if other.n_series != self.n_series or other.single != self.single:
+            raise ValueError("Cannot merge accumulators of different series")
+        for name in self.sums:
+            self.sums[name] = self.sums[name] * self._factor(other.n_observations) + other.sums[name]
+        # the pair across the boundary, which neither has seen
+        terms = ForecastTerms(
+            np.concatenate([self._last[0], other._first[0]], axis=-1),
+            np.concatenate([self._last[1], other._first[1]], axis=-1)
+        )
+        self._accumulate_relative(
+            terms.naive_errors, terms.relative_absolute_errors,
+            terms.bounded_relative_absolute_errors,
+            self._factor([other.n_observations, other.n_observations - 1])
+        )
+        self.n_observations += other.n_observations
+        self._last = other._last
+        return self
+
+    def score(self, metric):
+        if metric not in STREAMING_METRICS:
+            raise ValueError("Metric not available streaming: {}".format(metric))
+        if self.n_series is None:
+            return np.nan
+        sums = self.sums
+        if metric == "root_mean_squared_error":
+            result = np.sqrt(_ratio(sums["squared_errors"], sums["count"]))
+        elif metric == "mean_absolute_percentage_error":
+            result = _ratio(sums["absolute_percentage_errors"], sums["absolute_percentage_count"]) * 100
+        elif metric == "symmetric_mean_absolute_percentage_error":
+            result = _ratio(sums["symmetric_absolute_percentage_errors"], sums["symmetric_count"]) * 100
+        elif metric == "mean_absolute_scaled_error":
+            result = _ratio(
+                _ratio(sums["absolute_errors"], sums["count"]),
+                _ratio(sums["naive_errors"], sums["naive_count"])
+            )
+        elif metric == "mean_relative_absolute_error":
+            result = _ratio(sums["relative_absolute_errors"], sums["relative_count"])
+        elif metric == "geometric_mean_relative_absolute_error":
+            result = np.exp(_ratio(sums["log_relative_absolute_errors"], sums["relative_count"]))
+        else:
+            result = _ratio(sums["bounded_relative_absolute_errors"], sums["bounded_count"])
+            if metric == "unscaled_mean_bounded_relative_absolute_error":
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    result = result/(1-result)
+        return _per_series(result, self.single)
+
+    def evaluate(self, metrics=None):
+        """
+        Several metrics at once, as timeseries.evaluate.
+        """
+        metrics = STREAMING_METRICS if metrics is None else list(metrics)
+        scores = {metric: np.atleast_1d(self.score(metric)) for metric in metrics}
+        if self.single:
+            return pd.Series({metric: score[0] for metric, score in scores.items()})
+        return pd.DataFrame(scores, columns=metrics)
+
+class WindowedForecastErrors(_StreamingMetrics):
+    """
+    Forecast error metrics of the last window observations of a
+    stream, equal to TimeSeriesMetrics on those observations alone.
+
+    The window is a ring buffer, so update is O(batch) and reading a
+    metric O(window).  Every metric in timeseries.METRICS is available,
+    the medians included.
+
+    @window - the number of most recent observations scored
+    """
+    def __init__(self, window):
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.window = window
+        self.single = None
+        self.n_series = None
+        self.n_observations = 0
+        self._y_true = None
+        self._y_pred = None
+
+    @property
+    def filled(self):
+        return min(self.n_observations, self.window)
+
+    def update(self, y_true, y_pred):
+        """
+        Adds the next batch of actuals and their forecasts.
+        """
+        y_true, y_pred = self._check_series(y_true, y_pred)
+        if y_true.shape[-1] == 0:
+            return self
+        if self.n_series is None:
+            self.n_series = y_true.shape[0]
+            self._y_true = np.full((self.n_series, self.window), np.nan)
+            self._y_pred = np.full((self.n_series, self.window), np.nan)
+        self.n_observations += y_true.shape[-1]
+        self._write(y_true, y_pred)
+        return self
+
+    def _write(self, y_true, y_pred):
+        """
+        Stores the observations ending at n_observations; observation
+        t of the stream is kept at t % window.
+        """
+        kept = min(y_true.shape[-1], self.window)
+        positions = (self.n_observations - kept + np.arange(kept)) % self.window
+        self._y_true[:, positions] = y_true[:, y_true.shape[-1] - kept:]
+        self._y_pred[:, positions] = y_pred[:, y_pred.shape[-1] - kept:]
+
+    def observations(self):
+        """
+        The actuals and forecasts in the window, oldest first.
+        """
+        if self.n_series is None:
+            return np.empty((1, 0)), np.empty((1, 0))
+        positions = (self.n_observations - self.filled + np.arange(self.filled)) % self.window
+        return self._y_true[:, positions], self._y_pred[:, positions]
+
+    def merge(self, other):
+        """
+        Adds other, the window over the stretch of the series right
+        after this one's.
+        """
+        if self.window != other.window:
+            raise ValueError("Cannot merge windows of different lengths")
+        if other.n_series is None:
+            return self
+        y_true, y_pred = other.observations()
+        if other.single:
+            self._check_series(y_true[0], y_pred[0])
+        else:
+            self._check_series(y_true, y_pred)
+        if self.n_series is None:
+            self.n_series = other.n_series
+            self._y_true = np.full((self.n_series, self.window), np.nan)
+            self._y_pred = np.full((self.n_series, self.window), np.nan)
+        # other may have seen more observations than its window holds
+        self.n_observations += other.n_observations
+        self._write(y_true, y_pred)
+        return self
+
+    def score(self, metric):
+        if metric not in METRICS:
+            raise ValueError("Unknown metric: {}".format(metric))
+        if self.n_series is None:
+            return np.nan
+        terms = ForecastTerms(*self.observations())
+        return _per_series(METRICS[metric](terms), self.single)
+
+    def median_relative_absolute_error(self):
+        return self.score("median_relative_absolute_error")
+
+    def symmetric_median_absolute_percentage_error(self):
+        return self.score("symmetric_median_absolute_percentage_error")
+
+    def evaluate(self, metrics=None):
+        """
+        Several metrics at once, as timeseries.evaluate.
+        """
+        y_true, y_pred = self.observations()
+        if self.single:
+            y_true, y_pred = y_true[0], y_pred[0]
+        return evaluate(y_true, y_pred, metrics=metrics)
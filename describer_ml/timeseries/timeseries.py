@@ -1,17 +1,229 @@
 #from mlxtend.evaluate import permutation_test
-from statsmodels.tsa import stattools
-from statsmodels.stats import diagnostic
-from statsmodels.tsa.arima.model import ARIMA
 import warnings
 from collections import namedtuple
-from sklearn.metrics import mean_squared_error
-from sklearn.model_selection import train_test_split
+from functools import partial
 import numpy as np
-from sklearn import metrics
-from scipy.stats import mstats
+from describer_ml._lazy import lazy_import
+from describer_ml.timeseries import order_search, walk_forward
 warnings.filterwarnings("ignore")
 
+stattools = lazy_import("statsmodels.tsa.stattools")
+diagnostic = lazy_import("statsmodels.stats.diagnostic")
+arima_model = lazy_import("statsmodels.tsa.arima.model")
+pd = lazy_import("pandas")
+
+def _as_series(y_true, y_pred):
+    """
+    y_true and y_pred as (n_series, horizon) float arrays, and whether
+    they were a single 1-D series.
+    """
+    y_true = np.asarray(y_true, dtype=float)
+    y_pred = np.asarray(y_pred, dtype=float)
+    if y_true.shape != y_pred.shape:
+        raise ValueError("y_true and y_pred must have the same shape")
+    if y_true.ndim not in (1, 2):
+        raise ValueError("y_true and y_pred must be 1-D or (n_series, horizon)")
+    return np.atleast_2d(y_true), np.atleast_2d(y_pred), y_true.ndim == 1
+
+def _per_series(result, single):
+    return result[0] if single else result
+
+def _ratio(numerator, denominator):
+    """
+    numerator / denominator, NaN where the denominator is zero.
+    """
+    numerator, denominator = np.broadcast_arrays(numerator, denominator)
+    result = np.full(numerator.shape, np.nan)
+    return np.divide(numerator, denominator, out=result, where=denominator != 0)
+
+def _nan_mean(values):
+    """
+    The mean along the horizon skipping NaN terms, NaN for a series
+    with no defined terms; np.nanmean without its copies and warnings.
+    """
+    defined = ~np.isnan(values)
+    total = np.sum(values, axis=-1, where=defined)
+    return _ratio(total, np.count_nonzero(defined, axis=-1))
+
+def _nan_median(values):
+    """
+    The median along the horizon skipping NaN terms, NaN for a series
+    with no defined terms.  np.nanmedian falls back to a loop over the
+    series when they have NaN, this is one sort of all of them.
+    """
+    if values.shape[-1] == 0:
+        return np.full(values.shape[:-1], np.nan)
+    ordered = np.sort(values, axis=-1)  # NaN sorts last
+    count = np.count_nonzero(~np.isnan(ordered), axis=-1)
+    low = np.take_along_axis(ordered, np.maximum(count - 1, 0)[:, np.newaxis] // 2, axis=-1)[:, 0]
+    high = np.take_along_axis(ordered, (count // 2)[:, np.newaxis], axis=-1)[:, 0]
+    return np.where(count > 0, (low + high) / 2, np.nan)
+
+class ForecastTerms:
+    """
+    The building blocks the metrics share, each computed on first use
+    and then reused, so scoring several metrics on the same forecasts
+    costs little more than scoring one.
+
+    @y_true - Y[i], one series or (n_series, horizon)
+    @y_pred - F[i], the same shape
+    """
+    def __init__(self, y_true, y_pred):
+        self.y_true, self.y_pred, self.single = _as_series(y_true, y_pred)
+        self._terms = {}
+
+    def _term(self, name, compute):
+        if name not in self._terms:
+            self._terms[name] = compute()
+        return self._terms[name]
+
+    @property
+    def horizon(self):
+        return self.y_true.shape[-1]
+
+    @property
+    def errors(self):
+        return self._term("errors", lambda: self.y_true - self.y_pred)
+
+    @property
+    def absolute_errors(self):
+        return self._term("absolute_errors", lambda: np.abs(self.errors))
+
+    @property
+    def naive_errors(self):
+        """
+        |Y[i+1] - Y[i]|, the errors of the naive (last value) forecast.
+        """
+        return self._term(
+            "naive_errors", lambda: np.abs(np.diff(self.y_true, axis=-1))
+        )
+
+    @property
+    def relative_absolute_errors(self):
+        """
+        |Y[i] - F[i]| / |Y[i+1] - Y[i]| for i < horizon - 1.
+        """
+        return self._term("relative_absolute_errors", lambda: _ratio(
+            self.absolute_errors[:, :-1], self.naive_errors
+        ))
+
+    @property
+    def bounded_relative_absolute_errors(self):
+        """
+        |Y[i] - F[i]| / (|Y[i] - F[i]| + |Y[i+1] - Y[i]|) for i < horizon - 1.
+        """
+        return self._term("bounded_relative_absolute_errors", lambda: _ratio(
+            self.absolute_errors[:, :-1],
+            self.absolute_errors[:, :-1] + self.naive_errors
+        ))
+
+    @property
+    def symmetric_absolute_percentage_errors(self):
+        return self._term("symmetric_absolute_percentage_errors", lambda: _ratio(
+            self.absolute_errors, (np.abs(self.y_true) + np.abs(self.y_pred)) / 2
+        ))
+
+def _mean_bounded_relative_absolute_error(terms):
+    # kept, the unscaled MBRAE is derived from it
+    return terms._term("mean_bounded_relative_absolute_error", lambda: _nan_mean(
+        terms.bounded_relative_absolute_errors
+    ))
+
+def _unscaled_mean_bounded_relative_absolute_error(terms):
+    mbrae = _mean_bounded_relative_absolute_error(terms)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return mbrae/(1-mbrae)
+
+def _mean_absolute_percentage_error(terms):
+    return _nan_mean(
+        _ratio(terms.absolute_errors, np.abs(terms.y_true))
+    ) * 100
+
+def _root_mean_squared_error(terms):
+    return np.sqrt(np.mean(terms.errors**2, axis=-1))
+
+def _mean_relative_absolute_error(terms):
+    return _nan_mean(terms.relative_absolute_errors)
+
+def _median_relative_absolute_error(terms):
+    return _nan_median(terms.relative_absolute_errors)
+
+def _symmetric_mean_absolute_percentage_error(terms):
+    return _nan_mean(
+        terms.symmetric_absolute_percentage_errors
+    ) * 100
+
+def _symmetric_median_absolute_percentage_error(terms):
+    return _nan_median(
+        terms.symmetric_absolute_percentage_errors
+    ) * 100
+
+def _mean_absolute_scaled_error(terms):
+    numerator = np.sum(terms.absolute_errors, axis=-1)
+    denominator = np.sum(terms.naive_errors, axis=-1)
+    # NaN for a single step, which has no naive difference
+    coeficient = _ratio(float(terms.horizon), terms.horizon-1)
+    return _ratio(numerator, coeficient * denominator)
+
+def _geometric_mean_relative_absolute_error(terms):
+    with np.errstate(divide="ignore"):
+        logs = np.log(terms.relative_absolute_errors)
+    return np.exp(_nan_mean(logs))
+
+METRICS = {
+    "unscaled_mean_bounded_relative_absolute_error": _unscaled_mean_bounded_relative_absolute_error,
+    "mean_bounded_relative_absolute_error": _mean_bounded_relative_absolute_error,
+    "mean_absolute_percentage_error": _mean_absolute_percentage_error,
+    "root_mean_squared_error": _root_mean_squared_error,
+    "mean_relative_absolute_error": _mean_relative_absolute_error,
+    "median_relative_absolute_error": _median_relative_absolute_error,
+    "symmetric_mean_absolute_percentage_error": _symmetric_mean_absolute_percentage_error,
+    "symmetric_median_absolute_percentage_error": _symmetric_median_absolute_percentage_error,
+    "mean_absolute_scaled_error": _mean_absolute_scaled_error,
+    "geometric_mean_relative_absolute_error": _geometric_mean_relative_absolute_error,
+}
+
+def _score(metric, y_true, y_pred):
+    terms = ForecastTerms(y_true, y_pred)
+    return _per_series(METRICS[metric](terms), terms.single)
+
+def evaluate(y_true, y_pred, metrics=None):
+    """
+    Several metrics at once, sharing the absolute errors, naive
+    differences and symmetric denominators between them
+    (see ForecastTerms).
+
+    @y_true - Y[i], one series or (n_series, horizon)
+    @y_pred - F[i], the same shape
+    @metrics - names from METRICS, by default all of them
+
+    Returns a Series indexed by metric for a single series, or a
+    DataFrame with a row per series and a column per metric.
+    """
+    metrics = list(METRICS) if metrics is None else list(metrics)
+    for metric in metrics:
+        if metric not in METRICS:
+            raise ValueError("Unknown metric: {}".format(metric))
+    terms = ForecastTerms(y_true, y_pred)
+    scores = {metric: METRICS[metric](terms) for metric in metrics}
+    if terms.single:
+        return pd.Series({metric: score[0] for metric, score in scores.items()})
+    return pd.DataFrame(scores, columns=metrics)
+
 class TimeSeriesMetrics:
+    """
+    Forecast error metrics.
+
+    Every metric takes y_true and y_pred either as single series or as
+    (n_series, horizon) arrays, scoring each row, and returns a number
+    or an array of n_series numbers.  To score several metrics on the
+    same forecasts use evaluate, which shares the work between them.
+
+    Terms whose denominator is zero (y_true == 0 for MAPE, a repeated
+    value for the relative errors against the naive forecast, ...) are
+    undefined; they are NaN and left out of the mean, median or
+    geometric mean.  A series with no defined terms scores NaN.
+    """
     def __init__(self):
         pass
     
@@ -24,14 +236,7 @@ class TimeSeriesMetrics:
         @y_true - Y[i]
         @y_pred - F[i]
         """
-        numerator = [abs(elem - y_pred[idx]) for idx, elem in enumerate(y_true)]
-        series_one = y_true[1:]
-        series_two = y_true[:-1]
-        denominator = [abs(elem - series_two[idx]) for idx, elem in enumerate(series_one)]
-        final_series = [numerator[idx]/(numerator[idx] + denominator[idx])
-                        for idx in range(len(denominator))]
-        mbrae = np.mean(final_series)
-        return mbrae/(1-mbrae)
+        return _score("unscaled_mean_bounded_relative_absolute_error", y_true, y_pred)
 
     @staticmethod
     def mean_bounded_relative_absolute_error(y_true, y_pred):
@@ -42,22 +247,15 @@ class TimeSeriesMetrics:
         @y_true - Y[i]
         @y_pred - F[i]
         """
-        numerator = [abs(elem - y_pred[idx]) for idx, elem in enumerate(y_true)]
-        series_one = y_true[1:]
-        series_two = y_true[:-1]
-        denominator = [abs(elem - series_two[idx]) for idx, elem in enumerate(series_one)]
-        final_series = [numerator[idx]/(numerator[idx] + denominator[idx])
-                        for idx in range(len(denominator))]
-        return np.mean(final_series)
+        return _score("mean_bounded_relative_absolute_error", y_true, y_pred)
 
     @staticmethod
     def mean_absolute_percentage_error(y_true, y_pred): 
-        y_true, y_pred = np.array(y_true), np.array(y_pred)
-        return np.mean(np.abs((y_true - y_pred) / y_true)) * 100
+        return _score("mean_absolute_percentage_error", y_true, y_pred)
 
     @staticmethod
     def root_mean_squared_error(y_true, y_pred):
-        return np.sqrt(metrics.mean_squared_error(y_true, y_pred))
+        return _score("root_mean_squared_error", y_true, y_pred)
 
     @staticmethod
     def mean_relative_absolute_error(y_true, y_pred):
@@ -65,14 +263,7 @@ class TimeSeriesMetrics:
         formula comes from: 
         http://www.spiderfinancial.com/support/documentation/numxl/reference-manual/forecasting-performance/mrae
         """
-        numerator = [abs(elem - y_pred[idx])
-                     for idx, elem in enumerate(y_true)]
-        series_one = y_true[1:]
-        series_two = y_true[:-1]
-        denominator = [abs(elem - series_two[idx])
-                       for idx, elem in enumerate(series_one)]    
-        return np.mean([
-            numerator[i]/denominator[i] for i in range(len(numerator))])
+        return _score("mean_relative_absolute_error", y_true, y_pred)
 
     @staticmethod
     def median_relative_absolute_error(y_true, y_pred):
@@ -80,14 +271,7 @@ class TimeSeriesMetrics:
         formula comes from: 
         http://www.spiderfinancial.com/support/documentation/numxl/reference-manual/forecasting-performance/mrae
         """
-        numerator = [abs(elem - y_pred[idx])
-                     for idx, elem in enumerate(y_true)]
-        series_one = y_true[1:]
-        series_two = y_true[:-1]
-        denominator = [abs(elem - series_two[idx])
-                       for idx, elem in enumerate(series_one)]    
-        return np.median([
-            numerator[i]/denominator[i] for i in range(len(numerator))])
+        return _score("median_relative_absolute_error", y_true, y_pred)
 
     @staticmethod
     def symmetric_mean_absolute_percentage_error(y_true, y_pred):
@@ -95,11 +279,7 @@ class TimeSeriesMetrics:
         formula comes from:
         https://en.wikipedia.org/wiki/Symmetric_mean_absolute_percentage_error
         """
-        numerator = [abs(y_pred[idx] - elem) for idx, elem in enumerate(y_true)]
-        denominator = [abs(elem) + abs(y_pred[idx]) for idx, elem in enumerate(y_true)]
-        denominator = [elem/2 for elem in denominator]
-        result = np.mean([numerator[i]/denominator[i] for i in range(len(numerator))])
-        return result * 100
+        return _score("symmetric_mean_absolute_percentage_error", y_true, y_pred)
 
     @staticmethod
     def symmetric_median_absolute_percentage_error(y_true, y_pred):
@@ -107,34 +287,24 @@ class TimeSeriesMetrics:
         formula comes from:
         https://en.wikipedia.org/wiki/Symmetric_mean_absolute_percentage_error
         """
-        numerator = [abs(y_pred[idx] - elem) for idx, elem in enumerate(y_true)]
-        denominator = [abs(elem) + abs(y_pred[idx]) for idx, elem in enumerate(y_true)]
-        denominator = [elem/2 for elem in denominator]
-        result = np.median([numerator[i]/denominator[i] for i in range(len(numerator))])
-        return result * 100
+        return _score("symmetric_median_absolute_percentage_error", y_true, y_pred)
 
     @staticmethod
     def mean_absolute_scaled_error(y_true, y_pred):
         """
         formula comes from:
         https://en.wikipedia.org/wiki/Mean_absolute_scaled_error
+        NaN for a constant series, whose naive forecast is perfect.
         """
-        numerator = sum([abs(y_pred[idx] - elem)  for idx, elem in enumerate(y_true)])
-        series_one = y_true[1:]
-        series_two = y_true[:-1]
-        denominator = sum([abs(elem - series_two[idx])
-                       for idx, elem in enumerate(series_one)])
-        coeficient = len(y_true)/(len(y_true)-1)
-        return numerator/(coeficient * denominator)
+        return _score("mean_absolute_scaled_error", y_true, y_pred)
 
     @staticmethod
     def geometric_mean_relative_absolute_error(y_true, y_pred):
-        numerator = [abs(y_pred[idx] - elem)  for idx, elem in enumerate(y_true)]
-        series_one = y_true[1:]
-        series_two = y_true[:-1]
-        denominator = [abs(elem - series_two[idx])
-                       for idx, elem in enumerate(series_one)]
-        return mstats.gmean([numerator[i]/denominator[i] for i in range(len(numerator))])
+        return _score("geometric_mean_relative_absolute_error", y_true, y_pred)
+
+    @staticmethod
+    def evaluate(y_true, y_pred, metrics=None):
+        return evaluate(y_true, y_pred, metrics=metrics)
 
 
 class TimeSeriesHypothesisTests:
@@ -172,44 +342,64 @@ class TimeSeriesHypothesisTests:
         QstatResult = namedtuple('QstatResult', 'statistic pvalue')
         return QstatResult(result[0], result[1])
 
-    def _evaluate_arima_model(X, arima_order):
-        # prepare training dataset
-        train, test, _, _ = train_test_split(X, np.zeros(X.shape[0]))
-        history = list(train)
-        # make predictions
-        predictions = list()
-        for t in range(len(test)):
-            model = ARIMA(history, order=arima_order)
-            model_fit = model.fit(disp=0)
-            yhat = model_fit.forecast()[0]
-            predictions.append(yhat)
-            history.append(test[t])
-        # calculate out of sample error
-        error = mean_squared_error(test, predictions)
-        return error
+    @staticmethod
+    def _evaluate_arima_model(X, arima_order, refit_every=None):
+        """
+        The out of sample mean squared error of one step ahead
+        forecasts over the last quarter of X, see walk_forward.
+        """
+        return walk_forward.walk_forward(
+            X, arima_order, refit_every=refit_every
+        ).mean_squared_error
 
     # evaluate combinations of p, d and q values for an ARIMA model
     @staticmethod
-    def generate_model(timeseries):
-        best_score, best_cfg = float("inf"), None
-        p_values = [0, 1, 2, 4, 6, 8, 10]
-        d_values = range(0, 3)
-        q_values = range(0, 3)
-        best_order = (1, 0, 0)
-        # if no 'best order' then simply go with AR(1)
-        for p in p_values:
-            for d in d_values:
-                for q in q_values:
-                    order = (p,d,q)
-                    try:
-                        mse = self._evaluate_arima_model(timeseries, order)
-                        if mse < best_score:
-                            best_score = mse
-                            best_order = order
-                    except:
-                        continue
-        model = ARIMA(timeseries, order=best_order)
+    def generate_model(timeseries,
+                       p_values=(0, 1, 2, 4, 6, 8, 10),
+                       d_values=range(0, 3),
+                       q_values=range(0, 3),
+                       criterion="aic",
+                       executor="serial",
+                       n_jobs=None,
+                       fit_timeout=60,
+                       time_budget=600,
+                       patience=2,
+                       max_delta=10,
+                       refit_every=None,
+                       return_scores=False):
+        """
+        Fits the ARIMA order with the lowest out of sample mean squared
+        error (_evaluate_arima_model), searched with
+        order_search.search_orders: fitted in parallel for the
+        information criterion first, so hopeless orders are pruned
+        before the costly evaluation, within per fit and total time
+        limits.  If no order gets scored it falls back to the best
+        criterion, then to AR(1).
+
+        @executor - "serial" runs in this process; "process" fits
+        orders in parallel worker processes
+        @refit_every - see walk_forward.walk_forward
+        @return_scores - also return the search's score table
+        """
+        orders = [(p, d, q) for p in p_values for d in d_values for q in q_values]
+        scores = order_search.search_orders(
+            timeseries, orders,
+            evaluate=partial(
+                TimeSeriesHypothesisTests._evaluate_arima_model,
+                refit_every=refit_every
+            ),
+            criterion=criterion,
+            executor=executor,
+            n_jobs=n_jobs,
+            fit_timeout=fit_timeout,
+            time_budget=time_budget,
+            patience=patience,
+            max_delta=max_delta
+        )
+        model = arima_model.ARIMA(timeseries, order=order_search.best_order(scores))
         model_result = model.fit()
+        if return_scores:
+            return model, model_result, scores
         return model, model_result
 
     @staticmethod
@@ -0,0 +1,60 @@
+import warnings
+from collections import namedtuple
+import numpy as np
+from describer_ml._lazy import lazy_import
+
+arima_model = lazy_import("statsmodels.tsa.arima.model")
+
+WalkForwardResult = namedtuple("WalkForwardResult", "predictions test mean_squared_error refits")
+
+def chronological_split(timeseries, test_size=0.25):
+    """
+    The first and last part of the series, in time order.
+    test_size is a share of the series, or a number of points if at
+    least 1; a share is rounded up, as in train_test_split.
+    """
+    timeseries = np.asarray(timeseries, dtype=float)
+    if test_size < 1:
+        test_size = int(np.ceil(test_size * len(timeseries)))
+    test_size = int(test_size)
+    if not 0 < test_size < len(timeseries):
+        raise ValueError("test_size leaves no train or no test points")
+    return timeseries[:-test_size], timeseries[-test_size:]
+
+def walk_forward(timeseries, order, test_size=0.25, refit_every=None):
+    """
+    One step ahead ARIMA forecasts of the last test_size points of the
+    series, each made from every point before it.
+
+    Rather than a new fit per point, the model is fitted once on the
+    train part and its state extended over the test points
+    (ARIMAResults.extend) with the fitted parameters, one Kalman filter
+    pass; the forecasts are the same as appending one point at a time.
+
+    @test_size - see chronological_split
+    @refit_every - refit the parameters on all the points so far every
+    refit_every test points, warm started from the last fit; None
+    never refits
+
+    Returns WalkForwardResult of the forecasts, the test points, their
+    mean squared error and how many fits were made.
+    """
+    train, test = chronological_split(timeseries, test_size)
+    if refit_every is None:
+        refit_every = len(test)
+    predictions = []
+    params = None
+    refits = 0
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for start in range(0, len(test), refit_every):
+            history = np.concatenate([train, test[:start]])
+            result = arima_model.ARIMA(history, order=order).fit(start_params=params)
+            params = result.params
+            refits += 1
+            block = test[start:start + refit_every]
+            predictions.append(np.asarray(result.extend(block).predict()))
+    predictions = np.concatenate(predictions)
+    return WalkForwardResult(
+        predictions, test, float(np.mean((test - predictions)**2)), refits
+    )
@@ -27,4 +27,5 @@ setup(
     packages=["describer_ml", "describer_ml.timeseries", "describer_ml.numeric", "describer_ml.matching"],
     include_package_data=True,
     install_requires=["scikit-learn", "scipy", "numpy", "statsmodels", "pytest", "mlxtend", "ThinkBayes2"],
+    extras_require={"parquet": ["pyarrow"]},
 )
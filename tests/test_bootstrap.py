@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from describer_ml.numeric.bootstrap import bootstrap
+
+@pytest.fixture
+def data():
+    return np.random.default_rng(0).normal(size=300)
+
+def test_results_do_not_depend_on_batching(data):
+    results = [
+        bootstrap(data, "trimean", n_resamples=1000, random_state=7,
+                  max_batch_elements=max_batch_elements)
+        for max_batch_elements in [1, 300 * 40, 300 * 1000, 2**22]
+    ]
+    for result in results[1:]:
+        np.testing.assert_array_equal(
+            result.bootstrap_distribution, results[0].bootstrap_distribution
+        )
+
+def test_results_do_not_depend_on_n_jobs(data):
+    serial = bootstrap(data, "trimean", n_resamples=500, random_state=7, method="bca")
+    parallel = bootstrap(data, "trimean", n_resamples=500, random_state=7, method="bca", n_jobs=2)
+    np.testing.assert_array_equal(serial.bootstrap_distribution, parallel.bootstrap_distribution)
+    assert (serial.low, serial.high) == (parallel.low, parallel.high)
+
+def test_interval_covers_estimate(data):
+    result = bootstrap(data, "mean", n_resamples=999, random_state=1)
+    assert result.low < result.estimate < result.high
+    assert len(result.bootstrap_distribution) == 999
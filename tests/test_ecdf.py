@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from describer_ml.numeric.ecdf import ECDF
+
+def _reference_compare_value(value, cdf, max_deviance, distance_function):
+    # the dict scan ECDF.compare_indices replaced
+    if value in cdf:
+        return value
+    for value_two in cdf:
+        if (np.isclose(value, value_two) or
+                distance_function(value, value_two) < max_deviance):
+            return value_two
+    return None
+
+def _reference_within_boundary(cdf_one, cdf_two, spread, max_deviance,
+                               distance_function):
+    within = []
+    for value in cdf_one:
+        other_value = _reference_compare_value(
+            value, cdf_two, max_deviance, distance_function
+        )
+        # a matched value of 0.0 counts, unlike the old `if not other_value`
+        within.append(
+            other_value is not None and
+            cdf_one[value] - spread < cdf_two[other_value] < cdf_one[value] + spread
+        )
+    return np.array(within, dtype=bool)
+
+def _euclidean(value_one, value_two):
+    return abs(value_one - value_two)
+
+def _samples(seed):
+    rng = np.random.default_rng(seed)
+    continuous = rng.normal(size=(2, 40))
+    # few distinct values, 0.0 among them
+    tied = rng.integers(-3, 4, size=(2, 40)).astype(float)
+    # values np.isclose to each other but not equal
+    nearly = continuous[0] * (1 + rng.choice([0, 1e-7, -1e-7], size=40))
+    return [
+        (continuous[0], continuous[1]), (tied[0], tied[1]),
+        (continuous[0], nearly), (tied[0], tied[1] + 0.5)
+    ]
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("max_deviance", [0.0, 0.05, 0.5, 2.0])
+@pytest.mark.parametrize("distance_function", [None, lambda a, b: 2 * abs(a - b)])
+def test_matches_dict_scan(seed, max_deviance, distance_function):
+    reference_distance = distance_function or _euclidean
+    for one, two in _samples(seed):
+        ecdf_one, ecdf_two = ECDF.from_array(one), ECDF.from_array(two)
+        dict_one, dict_two = ecdf_one.to_dict(), ecdf_two.to_dict()
+        expected = [
+            _reference_compare_value(value, dict_two, max_deviance, reference_distance)
+            for value in ecdf_one.xs.tolist()
+        ]
+        indices = ecdf_two.compare_indices(
+            ecdf_one.xs, max_deviance, distance_function=distance_function
+        )
+        assert [None if index == -1 else ecdf_two.xs[index] for index in indices] == expected
+        for spread in [0.05, 0.2]:
+            np.testing.assert_array_equal(
+                ecdf_one.within_boundary(
+                    ecdf_two, spread, max_deviance, distance_function=distance_function
+                ),
+                _reference_within_boundary(
+                    dict_one, dict_two, spread, max_deviance, reference_distance
+                )
+            )
+
+@pytest.mark.parametrize("distance_function", [None, _euclidean])
+def test_zero_is_a_match(distance_function):
+    one = ECDF.from_array([0.0, 1.0])
+    two = ECDF.from_array([0.0, 1.0])
+    np.testing.assert_array_equal(two.compare_indices([0.0, 0.01], 0.1), [0, 0])
+    np.testing.assert_array_equal(
+        one.within_boundary(two, 0.1, 0.1, distance_function=distance_function),
+        [True, True]
+    )
+
+def test_empty():
+    empty = ECDF.from_array([])
+    np.testing.assert_array_equal(empty.compare_indices([0.0, 1.0], 1.0), [-1, -1])
+    assert not ECDF.from_array([1.0]).within_boundary(empty, 0.5, 1.0).any()
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+from scipy import stats
+from describer_ml.numeric import num_stats
+from describer_ml.numeric.frequency import FrequencyTable
+
+def test_entropy_matches_expanded_array():
+    array = np.array([1.0, 2.0, 2.0, 5.0, 5.0, 5.0])
+    table = FrequencyTable.from_array(array)
+    assert table.entropy() == pytest.approx(num_stats.entropy(array))
+    assert num_stats.entropy(table) == pytest.approx(num_stats.entropy(array))
+
+def test_distribution_entropy_is_of_the_counts():
+    table = FrequencyTable([1.0, 2.0, 5.0], [1, 2, 3])
+    other = FrequencyTable([1.0, 2.0, 5.0], [2, 2, 2])
+    assert table.distribution_entropy() == pytest.approx(stats.entropy([1, 2, 3]))
+    assert table.distribution_entropy(other) == pytest.approx(stats.entropy([1, 2, 3], [2, 2, 2]))
+    with pytest.raises(ValueError):
+        num_stats.entropy(table, other)
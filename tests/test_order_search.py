@@ -0,0 +1,59 @@
+import signal
+import time
+import numpy as np
+import pytest
+from describer_ml.timeseries import order_search
+
+pytest.importorskip("statsmodels")
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(0)
+    noise = rng.normal(size=120)
+    values = np.zeros(120)
+    for t in range(1, 120):
+        values[t] = 0.6 * values[t - 1] + noise[t]
+    return values
+
+ORDERS = [(p, d, q) for p in (0, 1, 2, 4) for d in range(2) for q in range(2)]
+
+def test_serial_search_scores_every_order(series):
+    table = order_search.search_orders(series, ORDERS, executor="serial", patience=None)
+    assert len(table) == len(ORDERS)
+    assert (table.fit_status == "ok").all()
+    assert order_search.best_order(table) == tuple(int(v) for v in table.aic.idxmin())
+
+@pytest.mark.parametrize("executor", ["serial", "process"])
+def test_time_budget_bounds_the_search(series, executor):
+    start = time.time()
+    table = order_search.search_orders(
+        np.tile(series, 20), [(p, 1, 2) for p in range(8, 14)],
+        executor=executor, n_jobs=2, fit_timeout=None, time_budget=1
+    )
+    # running fits are stopped at the deadline rather than left behind
+    assert time.time() - start < 5
+    assert set(table.fit_status) <= {"ok", "budget", "pruned"}
+    assert (table.fit_status != "ok").any()
+
+@pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="needs signal.setitimer")
+@pytest.mark.parametrize("caller_delay", [3600, 0.5])
+def test_caller_timer_survives_a_search(series, caller_delay):
+    fired = []
+    previous = signal.signal(signal.SIGALRM, lambda signum, frame: fired.append(signum))
+    try:
+        signal.setitimer(signal.ITIMER_REAL, caller_delay, 7200)
+        start = time.monotonic()
+        order_search.search_orders(series, ORDERS[:4], executor="serial", fit_timeout=60)
+        elapsed = time.monotonic() - start
+        delay, interval = signal.getitimer(signal.ITIMER_REAL)
+        assert interval == pytest.approx(7200)
+        if caller_delay > elapsed:
+            assert delay == pytest.approx(caller_delay - elapsed, abs=0.5)
+            assert not fired
+        else:
+            # due during the search, it fired through the caller's handler
+            assert fired
+        assert signal.getsignal(signal.SIGALRM) is not order_search._raise_timeout
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from describer_ml.matching.out_of_core import ChunkedMatcher
+
+def _frame(seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "label": rng.choice(["a", "b", "c"], size=600),
+        "x": rng.normal(size=600),
+        "y": rng.integers(0, 5, size=600).astype(float),
+    })
+
+def _check_moments(matcher, df):
+    expected = df.groupby("label")[["x", "y"]].mean()
+    np.testing.assert_allclose(
+        matcher.per_class("mean").loc[expected.index, expected.columns], expected
+    )
+    expected = df.groupby("label")[["x", "y"]].var(ddof=0)
+    np.testing.assert_allclose(
+        matcher.per_class("variance").loc[expected.index, expected.columns], expected
+    )
+
+def test_csv_in_chunks(tmp_path):
+    df = _frame()
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+    # a budget small enough to read the file in several chunks
+    matcher = ChunkedMatcher("label", memory_budget=2**16, k=50, seed=0)
+    assert matcher.chunk_rows(3) < len(df)
+    matcher.fit(path)
+    _check_moments(matcher, df)
+
+def test_parquet_in_chunks(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = _frame()
+    path = tmp_path / "data.parquet"
+    df.to_parquet(path, index=False)
+    matcher = ChunkedMatcher("label", memory_budget=2**16, k=50, seed=0)
+    matcher.fit(path, columns=["x", "y"])
+    _check_moments(matcher, df)
+
+def test_parquet_without_pyarrow_names_the_extra(tmp_path, monkeypatch):
+    import describer_ml.matching.out_of_core as out_of_core
+    from describer_ml._lazy import lazy_import
+    # a module which can't be imported, standing in for missing pyarrow
+    monkeypatch.setattr(
+        out_of_core, "parquet", lazy_import("describer_ml_missing_pyarrow", extra="parquet")
+    )
+    with pytest.raises(ImportError, match=r"describer_ml\[parquet\]"):
+        ChunkedMatcher("label").fit(tmp_path / "data.parquet")
+
+def test_nan_skipped_like_aggregate(tmp_path):
+    from describer_ml.matching.aggregate import aggregate
+    from describer_ml.matching.incremental import IncrementalMatcher
+    df = _frame()
+    df.loc[df.index % 7 == 0, "x"] = np.nan
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+    # k large enough for the sketch to keep every value, so exact
+    matcher = ChunkedMatcher("label", memory_budget=2**20, k=1000, seed=0).fit(path)
+    incremental = IncrementalMatcher("label", max_diffs={"median": 0.1, "mean": 0.1})
+    incremental.update(df)
+    expected = aggregate(df, "label", ["median", "mean", "variance", "skew"])
+    for stat in ["median", "mean"]:
+        np.testing.assert_allclose(incremental.per_class(stat), expected[stat])
+    np.testing.assert_allclose(matcher.per_class("mean"), expected["mean"])
+    np.testing.assert_allclose(matcher.per_class("variance"), expected["variance"])
+    # the sketch's median is an order statistic rather than the average
+    # of the middle two, close but not equal for an even count
+    np.testing.assert_allclose(matcher.per_class("median"), expected["median"], atol=0.01)
+    # the num_stats statistics are NaN with NaN present, as in aggregate
+    assert matcher.per_class("skew")["x"].isna().all()
+    assert expected["skew"]["x"].isna().all()
@@ -0,0 +1,79 @@
+import threading
+from concurrent.futures import CancelledError
+import numpy as np
+import pandas as pd
+import pytest
+from describer_ml.matching.grouped import GroupedFrame
+from describer_ml.matching.parallel import score_pairs
+from describer_ml.matching.pruning import candidate_pairs
+
+OPTIONS = {
+    "spread": "mean_absolute_deviation",
+    "remove_outliers": False,
+    "cache": None
+}
+
+def _grouped(seed=0, n_classes=6):
+    rng = np.random.default_rng(seed)
+    labels = np.repeat(np.arange(n_classes), rng.integers(2, 12, size=n_classes))
+    df = pd.DataFrame({
+        "label": labels,
+        "x": rng.integers(0, 5, size=len(labels)).astype(float),
+        "y": rng.normal(labels % 2, 1.0),
+    })
+    df.loc[rng.random(len(df)) < 0.1, "y"] = np.nan
+    return GroupedFrame(df, "label")
+
+MAX_DEVIANCES = [0.0, 0.3]
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("pruned", [False, True])
+def test_executors_agree(seed, pruned):
+    grouped = _grouped(seed)
+    candidates = None
+    if pruned:
+        candidates, _ = candidate_pairs(grouped.values, grouped.offsets, MAX_DEVIANCES, 0.5)
+    serial = score_pairs(
+        grouped.values, grouped.offsets, MAX_DEVIANCES, OPTIONS, candidates=candidates
+    )
+    n_classes = len(grouped.classes)
+    assert serial.shape == (n_classes * (n_classes - 1) // 2, 2)
+    for executor, chunk_size in [("thread", 1), ("thread", None), ("process", None)]:
+        np.testing.assert_array_equal(
+            score_pairs(
+                grouped.values, grouped.offsets, MAX_DEVIANCES, OPTIONS,
+                executor=executor, n_jobs=2, chunk_size=chunk_size,
+                candidates=candidates
+            ),
+            serial
+        )
+
+@pytest.mark.parametrize("executor", ["serial", "thread", "process"])
+def test_set_cancel_event_raises(executor):
+    grouped = _grouped()
+    cancel_event = threading.Event()
+    cancel_event.set()
+    with pytest.raises(CancelledError):
+        score_pairs(
+            grouped.values, grouped.offsets, MAX_DEVIANCES, OPTIONS,
+            executor=executor, n_jobs=2, chunk_size=1, cancel_event=cancel_event
+        )
+
+@pytest.mark.parametrize("executor", ["serial", "thread"])
+def test_cancel_while_scoring(executor):
+    grouped = _grouped()
+    cancel_event = threading.Event()
+    calls = []
+
+    def distance(value_one, value_two):
+        calls.append(1)
+        cancel_event.set()
+        return abs(value_one - value_two)
+
+    with pytest.raises(CancelledError):
+        score_pairs(
+            grouped.values, grouped.offsets, MAX_DEVIANCES,
+            dict(OPTIONS, distance_function=distance),
+            executor=executor, n_jobs=1, chunk_size=1, cancel_event=cancel_event
+        )
+    assert calls
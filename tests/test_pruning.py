@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+from describer_ml.matching.grouped import GroupedFrame
+from describer_ml.matching.match import (
+    distribution_match_cdf_hard_coded, distribution_match_cdf_median_absolute_deviation
+)
+from describer_ml.matching.pruning import candidate_pairs
+
+def _frame(seed, n_classes=7):
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(1, 15, size=n_classes)
+    labels = np.repeat(np.arange(n_classes), sizes)
+    shifts = rng.integers(0, 4, size=n_classes)[labels]
+    df = pd.DataFrame({
+        "label": labels,
+        # few distinct values, so many ties and exact matches
+        "ties": rng.integers(0, 4, size=len(labels)) + shifts,
+        "spread": rng.normal(shifts, 1.0),
+        "sparse": rng.normal(size=len(labels)).round(1),
+    })
+    df.loc[rng.random(len(df)) < 0.15, ["spread", "sparse"]] = np.nan
+    # one class with nothing but NaN in a column
+    df.loc[df["label"] == 0, "sparse"] = np.nan
+    # near copies of a few classes, so high thresholds still match
+    copies = []
+    for offset, source in enumerate(rng.choice(n_classes, size=3, replace=False)):
+        copy = df[df["label"] == source].copy()
+        copy["label"] = n_classes + offset
+        copy["spread"] += rng.normal(0, 0.1, size=len(copy))
+        copies.append(copy)
+    return pd.concat([df] + copies, ignore_index=True)
+
+MAX_DEVIANCES = {"ties": 0.0, "spread": 0.3, "sparse": 0.05}
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("min_percent_match", [0.0, 0.3, 0.6, 0.9])
+@pytest.mark.parametrize("match", [
+    distribution_match_cdf_hard_coded, distribution_match_cdf_median_absolute_deviation
+])
+def test_prune_does_not_change_matches(seed, min_percent_match, match):
+    df = _frame(seed)
+    pruned, stats = match(
+        df, "label", MAX_DEVIANCES, min_percent_match=min_percent_match,
+        prune=True, return_pruning_stats=True, cache=None
+    )
+    unpruned = match(
+        df, "label", MAX_DEVIANCES, min_percent_match=min_percent_match,
+        prune=False, cache=None
+    )
+    assert pruned == unpruned
+    assert stats.compared >= len(pruned)
+
+@pytest.mark.parametrize("seed", range(6))
+def test_pruning_stats_add_up(seed):
+    df = _frame(seed)
+    grouped = GroupedFrame(df, "label")
+    n_classes = len(grouped.classes)
+    candidates, stats = candidate_pairs(
+        grouped.values, grouped.offsets,
+        [MAX_DEVIANCES[column] for column in grouped.columns], 0.6
+    )
+    assert stats.cells == len(grouped.columns) * n_classes * (n_classes - 1) // 2
+    assert stats.cells == (
+        stats.pruned_by_signature + stats.pruned_by_range +
+        stats.pruned_by_bound + stats.compared
+    )
+    assert stats.compared == sum(len(later) for later in candidates.values())
+    for (column, first), later in candidates.items():
+        assert np.all(later > first) and np.all(np.diff(later) > 0)
+
+def test_pruning_stats_by_stage():
+    df = pd.DataFrame({
+        "label": np.repeat(list("abcde"), 4),
+        "x": [1, 1, 1, 1,  0, 1, 2, 3,  10, 11, 12, 13,
+              2.5, 3.5, 4.5, 5.5,  0, 1, 2, 3],
+    })
+    grouped = GroupedFrame(df, "label")
+    candidates, stats = candidate_pairs(grouped.values, grouped.offsets, [0.0], 0.5)
+    # a has one distinct value, c overlaps no other class, and d and b
+    # (or e) each have just one value in the other's range
+    assert stats == (10, 4, 3, 2, 1)
+    assert list(candidates) == [(0, 1)]
+    np.testing.assert_array_equal(candidates[(0, 1)], [4])
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from describer_ml.timeseries.streaming import (
+    ForecastErrorAccumulator, STREAMING_METRICS, WindowedForecastErrors
+)
+from describer_ml.timeseries.timeseries import METRICS, TimeSeriesMetrics
+
+def _series(n_series=3, horizon=40, seed=0):
+    rng = np.random.default_rng(seed)
+    y_true = rng.integers(-2, 3, size=(n_series, horizon)).astype(float)
+    y_pred = y_true + rng.integers(-1, 2, size=y_true.shape)
+    return y_true, y_pred
+
+@pytest.mark.parametrize("metric", STREAMING_METRICS)
+def test_accumulator_matches_batch_metrics(metric):
+    y_true, y_pred = _series()
+    accumulator = ForecastErrorAccumulator()
+    for batch in np.array_split(np.arange(y_true.shape[1]), 7):
+        accumulator.update(y_true[:, batch], y_pred[:, batch])
+    expected = getattr(TimeSeriesMetrics, metric)(y_true, y_pred)
+    np.testing.assert_allclose(accumulator.score(metric), expected)
+
+@pytest.mark.parametrize("accumulator", [
+    ForecastErrorAccumulator(), ForecastErrorAccumulator(decay=0.9),
+    WindowedForecastErrors(10)
+])
+def test_empty_first_batch(accumulator):
+    y_true, y_pred = _series(n_series=1)
+    accumulator.update([], [])
+    accumulator.update(y_true[0], y_pred[0])
+    assert accumulator.n_series == 1
+    assert np.isfinite(accumulator.root_mean_squared_error())
+    accumulator.update([], [])
+    assert accumulator.n_observations == y_true.shape[1]
+
+def test_empty_first_batch_then_several_series():
+    y_true, y_pred = _series()
+    accumulator = ForecastErrorAccumulator()
+    accumulator.update([], [])
+    accumulator.update(y_true, y_pred)
+    np.testing.assert_allclose(
+        accumulator.mean_absolute_scaled_error(),
+        TimeSeriesMetrics.mean_absolute_scaled_error(y_true, y_pred)
+    )
+
+def test_merge_matches_one_accumulator():
+    y_true, y_pred = _series()
+    whole = ForecastErrorAccumulator().update(y_true, y_pred)
+    first = ForecastErrorAccumulator().update(y_true[:, :15], y_pred[:, :15])
+    second = ForecastErrorAccumulator().update(y_true[:, 15:], y_pred[:, 15:])
+    first.merge(second)
+    for metric in STREAMING_METRICS:
+        np.testing.assert_allclose(first.score(metric), whole.score(metric))
+
+@pytest.mark.parametrize("metric", list(METRICS))
+def test_window_matches_last_observations(metric):
+    y_true, y_pred = _series()
+    window = WindowedForecastErrors(12)
+    for batch in np.array_split(np.arange(y_true.shape[1]), 5):
+        window.update(y_true[:, batch], y_pred[:, batch])
+    expected = getattr(TimeSeriesMetrics, metric)(y_true[:, -12:], y_pred[:, -12:])
+    np.testing.assert_allclose(window.score(metric), expected)
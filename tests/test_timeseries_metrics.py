@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from describer_ml.timeseries.timeseries import METRICS, TimeSeriesMetrics, evaluate
+
+def test_evaluate_matches_each_metric():
+    rng = np.random.default_rng(0)
+    y_true = rng.normal(10, 3, size=(20, 12))
+    y_pred = y_true + rng.normal(size=y_true.shape)
+    scores = evaluate(y_true, y_pred)
+    for metric in METRICS:
+        np.testing.assert_allclose(
+            scores[metric].to_numpy(), getattr(TimeSeriesMetrics, metric)(y_true, y_pred)
+        )
+
+def test_single_step_forecasts():
+    y_true = np.array([[1.0], [2.0]])
+    y_pred = np.array([[1.5], [2.0]])
+    scores = evaluate(y_true, y_pred)
+    # no naive difference to scale or compare against
+    for metric in [
+        "mean_absolute_scaled_error", "mean_relative_absolute_error",
+        "median_relative_absolute_error", "geometric_mean_relative_absolute_error",
+        "mean_bounded_relative_absolute_error"
+    ]:
+        assert scores[metric].isna().all()
+    np.testing.assert_allclose(scores["root_mean_squared_error"], [0.5, 0.0])
+    assert np.isnan(TimeSeriesMetrics.mean_absolute_scaled_error([1.0], [2.0]))
+
+def test_zero_denominators_are_skipped():
+    y_true = np.array([0.0, 1.0, 1.0, 3.0])
+    y_pred = np.array([1.0, 1.0, 2.0, 3.0])
+    # y_true == 0 is left out of MAPE
+    assert TimeSeriesMetrics.mean_absolute_percentage_error(y_true, y_pred) == pytest.approx(100 / 3)
+    # the repeated 1.0 has no naive error, leaving 1/1 and 1/2
+    assert TimeSeriesMetrics.mean_relative_absolute_error(y_true, y_pred) == pytest.approx(0.75)
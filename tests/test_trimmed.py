@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from scipy import stats
+from scipy.stats import mstats
+from describer_ml.numeric.frequency import FrequencyTable
+from describer_ml.numeric.num_stats import (
+    trimmed_mean, trimmed_mean_with_nan, winsorized_mean, winsorized_mean_with_nan,
+    winsorized_variance, winsorized_variance_with_nan
+)
+
+def _scipy_winsorized(values, limits):
+    return np.asarray(mstats.winsorize(values, limits=limits))
+
+@pytest.mark.parametrize("limits", [0.1, 0.25, (0.0, 0.2)])
+def test_matches_scipy(limits):
+    rng = np.random.default_rng(0)
+    data = rng.integers(0, 6, size=(37, 4)).astype(float)
+    lower, upper = (limits, limits) if np.ndim(limits) == 0 else limits
+    if lower == upper:
+        np.testing.assert_allclose(
+            trimmed_mean(data, limits, axis=0), stats.trim_mean(data, lower, axis=0)
+        )
+    for column in range(data.shape[1]):
+        winsorized = _scipy_winsorized(data[:, column], (lower, upper))
+        assert winsorized_mean(data[:, column], limits) == pytest.approx(winsorized.mean())
+        assert winsorized_variance(data[:, column], limits) == pytest.approx(winsorized.var())
+
+def test_nan_slices():
+    data = np.array([[1.0, np.nan], [2.0, np.nan], [np.nan, np.nan], [9.0, np.nan]])
+    for function in [trimmed_mean, winsorized_mean, winsorized_variance]:
+        assert np.isnan(function(data, 0.1, axis=0)).all()
+    for function in [trimmed_mean_with_nan, winsorized_mean_with_nan,
+                     winsorized_variance_with_nan]:
+        result = function(data, 0.1, axis=0)
+        assert result[0] == pytest.approx(function([1.0, 2.0, 9.0], 0.1))
+        # nothing left once NaN is dropped
+        assert np.isnan(result[1])
+    assert np.isnan(trimmed_mean([], 0.1))
+
+def test_frequency_table_nan_only():
+    table = FrequencyTable([np.nan, np.nan])
+    assert np.isnan(table.trimmed_mean())
+    assert np.isnan(trimmed_mean_with_nan(table))
+    assert np.isnan(winsorized_mean_with_nan(table))
+    assert np.isnan(winsorized_variance_with_nan(table))
+
+def test_frequency_table_matches_arrays():
+    values = np.array([1.0, 2.0, 2.0, 3.0, 7.0, 7.0, 7.0, np.nan])
+    table = FrequencyTable(values)
+    for limits in [0.1, 0.3]:
+        assert trimmed_mean_with_nan(table, limits) == pytest.approx(
+            trimmed_mean_with_nan(values, limits))
+        assert winsorized_variance_with_nan(table, limits) == pytest.approx(
+            winsorized_variance_with_nan(values, limits))
+
+def test_over_trim_still_raises():
+    with pytest.raises(ValueError):
+        trimmed_mean([1.0, 2.0], 0.5)
+    with pytest.raises(ValueError):
+        trimmed_mean_with_nan([1.0, 2.0, np.nan], 0.5)
+    with pytest.raises(ValueError):
+        FrequencyTable([1.0, 2.0]).winsorized_mean(0.5)
@@ -0,0 +1,61 @@
+import warnings
+import numpy as np
+import pytest
+from scipy import stats
+from describer_ml.matching.two_sample import pairwise_two_sample
+
+def _column(seed, tied):
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(3, 25, size=6)
+    # one class with nothing but NaN, and one with no rows at all
+    sizes[2] = 0
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    labels = np.repeat(np.arange(len(sizes)), sizes)
+    if tied:
+        values = rng.integers(0, 5, size=len(labels)) + (labels % 2)
+    else:
+        values = rng.normal(labels % 3, 1.0)
+    values = values.astype(float)
+    values[labels == 4] = np.nan
+    values[rng.random(len(values)) < 0.1] = np.nan
+    return values, offsets
+
+def _scipy(test, one, two):
+    if test == "ks":
+        result = stats.ks_2samp(one, two, method="asymp")
+        return result.statistic, result.pvalue
+    with warnings.catch_warnings():
+        # p-values capped to [0.001, 0.25]
+        warnings.simplefilter("ignore", UserWarning)
+        result = stats.anderson_ksamp([one, two])
+    return result.statistic, result.significance_level
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("tied", [False, True])
+@pytest.mark.parametrize("test", ["ks", "anderson"])
+def test_matches_scipy_per_pair(seed, tied, test):
+    values, offsets = _column(seed, tied)
+    result = pairwise_two_sample(values, offsets, test=test)
+    n_classes = len(offsets) - 1
+    assert result.statistic.shape == result.pvalue.shape == (n_classes, n_classes)
+    np.testing.assert_array_equal(result.statistic, result.statistic.T)
+    np.testing.assert_array_equal(result.pvalue, result.pvalue.T)
+    assert np.isnan(np.diag(result.statistic)).all()
+    for first in range(n_classes):
+        one = values[offsets[first]:offsets[first + 1]]
+        one = one[~np.isnan(one)]
+        for second in range(first + 1, n_classes):
+            two = values[offsets[second]:offsets[second + 1]]
+            two = two[~np.isnan(two)]
+            if len(one) == 0 or len(two) == 0:
+                # the empty classes, 2 and 4
+                assert np.isnan(result.statistic[first, second])
+                assert np.isnan(result.pvalue[first, second])
+                continue
+            statistic, pvalue = _scipy(test, one, two)
+            assert result.statistic[first, second] == pytest.approx(statistic)
+            assert result.pvalue[first, second] == pytest.approx(pvalue)
+
+def test_unknown_test():
+    with pytest.raises(ValueError):
+        pairwise_two_sample(np.zeros(4), np.array([0, 2, 4]), test="t")